@@ -0,0 +1,52 @@
+"""
+Small helpers shared by the benchmark scripts.
+
+The apps live in files with spaces in their names, so they cannot be imported
+with a plain import statement. load_script() loads them by path instead.
+"""
+import importlib.util
+import os
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_script(filename, module_name):
+    """
+    Loads one of the app scripts from the repository root as a module.
+    :param filename: The script file name, e.g. "to do list aditya.py".
+    :param module_name: The name to register the module under.
+    """
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR) # The scripts import their helper modules from the repository root
+    path = os.path.join(REPO_DIR, filename)
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def time_call(func, repeat=200):
+    """
+    Calls func() repeat times and returns the average time per call in microseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def best_time(func, repeat=200, rounds=5):
+    """
+    Times rounds of repeat calls to func() and returns the fastest round's time per call in
+    microseconds. The minimum is the least disturbed by other work on the machine.
+    """
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        elapsed = (time.perf_counter() - start) / repeat * 1e6
+        best = elapsed if best is None else min(best, elapsed)
+    return best
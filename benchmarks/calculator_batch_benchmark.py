@@ -0,0 +1,61 @@
+"""
+Compares evaluating a formula row by row against calculator_batch.evaluate_batch().
+
+"per row" calls calculator_engine.evaluate() once per row, which is what a loop
+around the calculator logic would do. "python" is the pure-Python batch loop and
+"numpy" the vectorized path (skipped when NumPy is not installed). Runs headless.
+
+Usage: python benchmarks/calculator_batch_benchmark.py [--rows 10000 100000]
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from _common import time_call
+from calculator_batch import evaluate_batch, np
+from calculator_engine import evaluate
+
+EXPRESSION = "(price * qty - discount) * (1 + tax / 100)"
+REPEAT = 3
+
+
+def make_columns(rows):
+    rng = random.Random(1)
+    return {
+        "price": [round(rng.uniform(0.5, 100), 2) for _ in range(rows)],
+        "qty": [float(rng.randint(1, 20)) for _ in range(rows)],
+        "discount": [round(rng.uniform(0, 5), 2) for _ in range(rows)],
+        "tax": [rng.choice([0.0, 7.0, 19.0]) for _ in range(rows)],
+    }
+
+
+def per_row(columns, rows):
+    names = list(columns)
+    for i in range(rows):
+        evaluate(EXPRESSION, **{name: columns[name][i] for name in names})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args(argv)
+
+    print(f"{'rows':>8} {'per row':>10} {'python':>10} {'numpy':>10}  (ms per batch)  {EXPRESSION}")
+    for rows in args.rows:
+        columns = make_columns(rows)
+        looped = time_call(lambda: per_row(columns, rows), REPEAT) / 1000
+        python = time_call(lambda: evaluate_batch(EXPRESSION, columns, use_numpy=False), REPEAT) / 1000
+        if np is not None:
+            arrays = {name: np.asarray(values) for name, values in columns.items()}
+            vectorized = f"{time_call(lambda: evaluate_batch(EXPRESSION, arrays), REPEAT) / 1000:>10.1f}"
+        else:
+            vectorized = f"{'n/a':>10}"
+        print(f"{rows:>8} {looped:>10.1f} {python:>10.1f} {vectorized}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
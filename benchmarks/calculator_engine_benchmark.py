@@ -0,0 +1,44 @@
+"""
+Measures how much the compiled-expression cache of the calculator engine saves.
+
+For a few formulas it times a full parse + compile + evaluate, a cached
+evaluate(text) call, and evaluating an already compiled expression directly.
+Runs headless.
+
+Usage: python benchmarks/calculator_engine_benchmark.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from _common import time_call
+from calculator_engine import CompiledExpression, compile_expression, evaluate
+
+# Formulas without variables are folded to a constant when compiled, so the last two
+# show the cost of evaluating a compiled formula that really has work left to do.
+EXPRESSIONS = [
+    ("1 + 2", {}),
+    ("2 * (3 + 4) - 5 / 6", {}),
+    ("(1 + 2) * (3 + 4) * (5 + 6) / (7 - 8) ^ 2 + sin(1) * cos(2) - log(100, 10)", {}),
+    ("x^2 + 3*x - sqrt(y)", {"x": 2.5, "y": 9.0}),
+    ("(price * qty - discount) * (1 + tax / 100)", {"price": 9.99, "qty": 3, "discount": 2.0, "tax": 19.0}),
+]
+REPEAT = 5000
+
+
+def main():
+    print(f"{'parse+eval':>11} {'cached':>8} {'compiled':>9} {'speedup':>8}  (us/op)  expression")
+    for text, values in EXPRESSIONS:
+        compile_expression.cache_clear()
+        uncached = time_call(lambda: CompiledExpression(text).evaluate(**values), REPEAT)
+        evaluate(text, **values) # Fill the cache
+        cached = time_call(lambda: evaluate(text, **values), REPEAT)
+        compiled = compile_expression(text)
+        direct = time_call(lambda: compiled.evaluate(**values), REPEAT)
+        print(f"{uncached:>11.2f} {cached:>8.2f} {direct:>9.2f} {uncached / cached:>7.1f}x  {text}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
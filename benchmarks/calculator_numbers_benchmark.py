@@ -0,0 +1,57 @@
+"""
+Compares the old float-only calculate() arithmetic with calculator_numbers.arithmetic().
+
+"float only" is what calculate() used to do: float() both inputs, apply the
+operator and format with 8 decimals. "adaptive" is arithmetic() plus
+format_number(), and "path" shows which number type it ended up using. The
+first rows are the common case and should stay on the float path. Runs headless.
+
+Usage: python benchmarks/calculator_numbers_benchmark.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from _common import time_call
+from calculator_numbers import DEFAULT_PRECISION, arithmetic, format_number
+
+OPERATIONS = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+    "/": lambda a, b: a / b,
+}
+
+CASES = [
+    ("12.5", "+", "3", DEFAULT_PRECISION),
+    ("1234.56", "*", "78.9", DEFAULT_PRECISION),
+    ("19.99", "/", "4", DEFAULT_PRECISION),
+    ("12", "*", "7", DEFAULT_PRECISION),
+    ("0.1", "+", "0.2", DEFAULT_PRECISION),
+    ("1", "/", "3", DEFAULT_PRECISION),
+    ("1152921504606846976", "+", "1", DEFAULT_PRECISION),
+    ("1e-200", "*", "1e-200", DEFAULT_PRECISION),
+    ("12.5", "+", "3", 28),
+]
+REPEAT = 20000
+
+
+def float_only(num1, num2, operator):
+    result = OPERATIONS[operator](float(num1), float(num2))
+    return f"{result:.8f}".rstrip('0').rstrip('.')
+
+
+def main():
+    print(f"{'float only':>11} {'adaptive':>9} {'path':>9}  (us/op)  {'calculation':<41} result")
+    for num1, operator, num2, precision in CASES:
+        old = time_call(lambda: float_only(num1, num2, operator), REPEAT)
+        new = time_call(lambda: format_number(arithmetic(num1, num2, operator, precision), precision), REPEAT)
+        result = arithmetic(num1, num2, operator, precision)
+        calculation = f"{num1} {operator} {num2} ({precision} digits)"
+        print(f"{old:>11.2f} {new:>9.2f} {type(result).__name__:>9}  {calculation:<41} {format_number(result, precision)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Compares three app processes against one launcher process: start-up time and memory.
+
+"separate" starts each app as its own Python process, as the desktop shortcuts
+do, and times it from process start until its window is drawn. "launcher"
+starts launcher.py once and times opening each app in it. Memory is the
+resident set size (RSS) of each process once its windows are drawn; for the
+separate processes the three are added up. Needs a display, since it creates
+real Tk windows.
+
+Usage: python benchmarks/launcher_benchmark.py [--runs 3]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _common import load_script
+
+APP_NAMES = ["calculator", "password", "todo"]
+
+
+def rss_kb():
+    """Returns the resident set size of this process in KiB, or None where it cannot be read."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss # Peak, not current, where /proc is missing
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def child_separate(name):
+    """Runs one app in this process, as its script would, and reports when its window is drawn."""
+    import tkinter as tk
+    launcher = load_script("launcher.py", "launcher")
+    text, filename, module_name, class_name = launcher.APPS[name]
+    module = load_script(filename, module_name)
+    root = tk.Tk()
+    getattr(module, class_name)(root)
+    root.update()
+    print(json.dumps({"ready": time.time(), "rss_kb": rss_kb()}))
+    root.destroy()
+
+
+def child_launcher():
+    """Runs the launcher in this process, opens every app, and reports the time each one took."""
+    import tkinter as tk
+    launcher = load_script("launcher.py", "launcher")
+    root = tk.Tk()
+    app = launcher.LauncherApp(root)
+    root.update()
+    ready = time.time()
+    open_ms = {}
+    for name in APP_NAMES:
+        start = time.perf_counter()
+        app.open_app(name)
+        root.update()
+        open_ms[name] = (time.perf_counter() - start) * 1000
+    print(json.dumps({"ready": ready, "open_ms": open_ms, "rss_kb": rss_kb()}))
+    app.on_close()
+
+
+def run_child(args, directory):
+    """Starts this script in child mode; returns (milliseconds until ready, report)."""
+    start = time.time()
+    done = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", *args],
+                          cwd=directory, capture_output=True, text=True)
+    if done.returncode != 0:
+        raise RuntimeError(done.stderr.strip().splitlines()[-1] if done.stderr.strip() else "child failed")
+    report = json.loads(done.stdout.strip().splitlines()[-1])
+    return (report["ready"] - start) * 1000, report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="Repeats of each measurement (default: 3).")
+    parser.add_argument("--child", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        if args.child[0] == "separate":
+            child_separate(args.child[1])
+        else:
+            child_launcher()
+        return 0
+
+    # Run from a scratch directory so the to-do list never touches the real tasks.json
+    directory = tempfile.mkdtemp()
+    try:
+        separate = {name: [run_child(["separate", name], directory) for _ in range(args.runs)] for name in APP_NAMES}
+        launched = [run_child(["launcher"], directory) for _ in range(args.runs)]
+    except RuntimeError as e:
+        print(f"Cannot run the apps ({e}); this benchmark needs a display.")
+        return 1
+
+    def mb(kb):
+        return f"{kb / 1024:.1f}" if kb is not None else "n/a"
+
+    print(f"{'start ms':>9} {'RSS MB':>8}  separate processes")
+    total_rss = 0
+    for name in APP_NAMES:
+        start = statistics.median(ms for ms, _ in separate[name])
+        rss = statistics.median(report["rss_kb"] or 0 for _, report in separate[name])
+        total_rss += rss
+        print(f"{start:>9.1f} {mb(rss):>8}  {name}")
+    print(f"{'':>9} {mb(total_rss):>8}  total of the three processes")
+
+    print(f"\n{'open ms':>9} {'RSS MB':>8}  launcher, one process")
+    print(f"{statistics.median(ms for ms, _ in launched):>9.1f} {'':>8}  launcher window")
+    for name in APP_NAMES:
+        print(f"{statistics.median(report['open_ms'][name] for _, report in launched):>9.1f} {'':>8}  {name}")
+    print(f"{'':>9} {mb(statistics.median(report['rss_kb'] or 0 for _, report in launched)):>8}  launcher with all three open")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
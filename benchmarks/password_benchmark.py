@@ -0,0 +1,57 @@
+"""
+Measures password generation throughput in passwords per second.
+
+"random.choice" is the old per-character loop of the Password Generator window
+(Mersenne Twister, one call per character, then a shuffle). The other rows use
+password_core: one password at a time through make_password(), the block-based
+PasswordGenerator, and password_chunks() over a process pool. Runs headless.
+
+Usage: python benchmarks/password_benchmark.py [--count 200000] [--length 16] [--processes 1 2 4]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from password_core import PasswordGenerator, character_classes, make_password, password_chunks
+
+
+def old_password(length, classes):
+    character_pool = "".join(classes)
+    required_characters = [random.choice(characters) for characters in classes]
+    password_list = required_characters + [random.choice(character_pool) for _ in range(length - len(classes))]
+    random.shuffle(password_list)
+    return "".join(password_list)
+
+
+def rate(func, count):
+    start = time.perf_counter()
+    func()
+    return count / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=200000)
+    parser.add_argument("--length", type=int, default=16)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args(argv)
+    classes = character_classes()
+    count, length = args.count, args.length
+    single = max(1, count // 10) # The one-at-a-time cases are slow, so time fewer of them
+
+    print(f"{'passwords/s':>12}  method ({count} passwords of length {length}, {os.cpu_count()} CPUs)")
+    print(f"{rate(lambda: [old_password(length, classes) for _ in range(single)], single):>12,.0f}  random.choice per character (old)")
+    print(f"{rate(lambda: [make_password(length, classes) for _ in range(single)], single):>12,.0f}  make_password() one at a time")
+    print(f"{rate(lambda: PasswordGenerator(length, classes).passwords(count), count):>12,.0f}  PasswordGenerator.passwords()")
+    for processes in args.processes:
+        print(f"{rate(lambda: sum(map(len, password_chunks(count, length, classes, processes))), count):>12,.0f}"
+              f"  password_chunks() with {processes} process{'es' if processes > 1 else ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""
+Measures the breached-password Bloom filter: build rate, open time and check time.
+
+A list of random passwords is written to a temporary file and built into a
+filter with password_blocklist.py. Opening only reads the header and maps the
+file, so it takes the same time for any list size. The false-hit rate is
+measured on passwords that are not in the list. Runs headless.
+
+Usage: python benchmarks/password_blocklist_benchmark.py [--count 500000] [--error-rate 0.001]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from _common import time_call
+from password_blocklist import BloomFilter, build_filter
+from password_core import PasswordGenerator, character_classes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=500000)
+    parser.add_argument("--error-rate", type=float, default=0.001)
+    args = parser.parse_args(argv)
+    generator = PasswordGenerator(10, character_classes(symbols=False))
+    listed = generator.passwords(args.count)
+    unlisted = generator.passwords(100000)
+
+    directory = tempfile.mkdtemp()
+    list_path = os.path.join(directory, "list.txt")
+    filter_path = os.path.join(directory, "list.bloom")
+    with open(list_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(listed))
+
+    start = time.perf_counter()
+    with open(list_path, "rb") as f:
+        build_filter(f, filter_path, args.count, args.error_rate)
+    build_seconds = time.perf_counter() - start
+
+    open_us = time_call(lambda: BloomFilter(filter_path).close(), 100)
+    with BloomFilter(filter_path) as blocklist:
+        check_us = time_call(lambda: unlisted[0] in blocklist, 100000)
+        false_hits = sum(password in blocklist for password in unlisted)
+        size = os.path.getsize(filter_path)
+
+    print(f"{args.count:,} passwords, {size:,} byte filter ({size * 8 / args.count:.1f} bits per password)")
+    print(f"{args.count / build_seconds:>12,.0f}  passwords/s built")
+    print(f"{open_us:>12.1f}  us to open")
+    print(f"{check_us:>12.2f}  us per check")
+    print(f"{false_hits / len(unlisted):>12.5f}  false-hit rate (target {args.error_rate})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Measures the cost of the strength meter per keystroke, in microseconds.
+
+Typing a password one character at a time scores every prefix, first uncached
+(each prefix is new) and then again from the cache, as when the same text
+comes back after a deletion. The settings estimate is timed the same way for
+every length the window accepts. Runs headless.
+
+Usage: python benchmarks/password_strength_benchmark.py [--length 64]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from _common import time_call
+from password_core import MAX_LENGTH, character_classes, make_password
+from password_strength import score_password, settings_bits
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--length", type=int, default=64)
+    args = parser.parse_args(argv)
+    classes = tuple(character_classes())
+    password = make_password(args.length, list(classes))
+    prefixes = [password[:end] for end in range(1, len(password) + 1)]
+
+    def type_password():
+        score_password.cache_clear()
+        for prefix in prefixes:
+            score_password(prefix)
+
+    def retype_password():
+        for prefix in prefixes:
+            score_password(prefix)
+
+    def change_length():
+        settings_bits.cache_clear()
+        for length in range(len(classes), MAX_LENGTH + 1):
+            settings_bits(length, classes)
+
+    per_length = MAX_LENGTH + 1 - len(classes)
+    print(f"{'us/keystroke':>12}  case (password of length {args.length})")
+    print(f"{time_call(type_password, 50) / len(prefixes):>12.2f}  score_password(), new text")
+    print(f"{time_call(retype_password, 50) / len(prefixes):>12.2f}  score_password(), cached")
+    print(f"{time_call(change_length, 50) / per_length:>12.2f}  settings_bits(), new length")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Measures how long headless use of the apps takes to start.
+
+Each case runs in a fresh Python process. The "tkinter" row is what every app
+used to pay on import before tkinter became a lazy import; the other rows
+import the GUI-free cores, load the app scripts without opening a window, or
+run the command line tools. The last column checks that tkinter was not
+imported along the way. Runs headless.
+
+Usage: python benchmarks/startup_benchmark.py [--runs 20]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _common import REPO_DIR
+
+LOAD_SCRIPTS = (
+    "import sys; sys.path.insert(0, 'benchmarks'); from _common import load_script; "
+    "load_script('calculator.py', 'calculator_app'); "
+    "load_script('password generator.py', 'password_app'); "
+    "load_script('to do list aditya.py', 'todo_app')"
+)
+
+CASES = [
+    ("python alone", ["-c", "pass"]),
+    ("tkinter", ["-c", "import tkinter, tkinter.messagebox, tkinter.ttk, tkinter.filedialog"]),
+    ("calculator core", ["-c", "import calculator_engine, calculator_numbers"]),
+    ("password core", ["-c", "import password_core"]),
+    ("todo core", ["-c", "import todo_model, todo_storage, todo_index, todo_io"]),
+    ("app scripts, no window", ["-c", LOAD_SCRIPTS]),
+    ("calculator_engine.py CLI", ["calculator_engine.py", "2 * (3 + 4)"]),
+    ("password_core.py CLI", ["password_core.py", "--count", "5"]),
+    ("todo_cli.py list", ["todo_cli.py", "--store", "{store}", "list"]),
+]
+
+# Runs a case and reports on stderr whether tkinter ended up in sys.modules
+WRAPPER = """import sys, runpy
+sys.argv = sys.argv[1:]
+try:
+    {run}
+except SystemExit:
+    pass
+print('tkinter' in sys.modules, file=sys.stderr)"""
+
+
+def run_case(args, store):
+    """Runs one case in a new interpreter; returns (seconds, whether tkinter got imported)."""
+    args = [arg.replace("{store}", store) for arg in args]
+    if args[0] == "-c":
+        code = WRAPPER.format(run=f"exec({args[1]!r})")
+    else:
+        code = WRAPPER.format(run=f"runpy.run_path({args[0]!r}, run_name='__main__')")
+    start = time.perf_counter()
+    done = subprocess.run([sys.executable, "-c", code, *args], cwd=REPO_DIR, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    return elapsed, done.stderr.strip().endswith("True")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20, help="Processes started per case (default: 20).")
+    args = parser.parse_args(argv)
+
+    store = os.path.join(tempfile.mkdtemp(), "tasks.json")
+    print(f"{'median ms':>10} {'min ms':>8}  {'case':<26} tkinter imported")
+    for name, case_args in CASES:
+        times = []
+        imported = False
+        for _ in range(args.runs):
+            elapsed, imported = run_case(case_args, store)
+            times.append(elapsed * 1000)
+        print(f"{statistics.median(times):>10.1f} {min(times):>8.1f}  {name:<26} {'yes' if imported else 'no'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""
+Benchmark suite for the calculator, password generator and to-do list, with regression checks.
+
+Each case is timed as the fastest of several rounds and reported in
+microseconds per operation. Without a display the suite times the code behind
+the app callbacks:
+
+    calculator   CalculatorApp.calculate: arithmetic() and format_number()
+    password     PasswordGeneratorApp.generate_password: make_password() for
+                 several lengths and sets of character types
+    todo         TodoApp add/update/delete: the task list, search index and
+                 journal storage updates at 1k, 10k and 100k tasks; save_tasks
+                 and load_tasks: a full write and read of the task file
+
+With --gui (needs a display) the app callbacks themselves are timed as well,
+on real Tk widgets in a hidden window.
+
+Results can be saved as JSON and compared against a saved baseline; a case
+that got slower by more than the threshold is flagged and the exit code is 1:
+
+    python benchmarks/suite.py --output baseline.json
+    python benchmarks/suite.py --compare baseline.json --threshold 0.15
+
+A case that looks slower than its baseline is timed again up to RETRIES times
+before it is flagged, so a burst of other work on the machine is not mistaken
+for a regression. Cases that wait for the disk (every to-do change is fsynced)
+vary much more from run to run and have their own, higher threshold.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from _common import best_time, load_script
+from calculator_numbers import DEFAULT_PRECISION, arithmetic, format_number
+from password_core import character_classes, make_password
+from todo_index import TaskIndex
+from todo_model import Task
+from todo_storage import JournalStorage
+
+OPERATORS = ["+", "-", "*", "/"]
+NUMBERS = [
+    ("int", "123456789", "987654321"),
+    ("float", "3.14159", "2.71828"),
+    ("huge", "1.5e200", "2.5e200"), # Products leave the float range and use Decimal
+]
+PASSWORD_LENGTHS = [8, 16, 64, 128]
+CLASS_SETS = [
+    ("lower", (True, False, False, False)),
+    ("alnum", (True, True, True, False)),
+    ("all", (True, True, True, True)),
+]
+TODO_SIZES = [1000, 10000, 100000]
+THRESHOLD = 0.10 # Slowdown (as a fraction) that counts as a regression
+DISK_THRESHOLD = 0.50 # The same for cases that wait for the disk
+DISK_BOUND = ("todo.", "gui.todo.save_tasks", "gui.todo.load_tasks") # Names of those cases start with one of these
+RETRIES = 3 # Extra timings of a case that looks slower than its baseline
+RETRY_PAUSE = 1.0 # Seconds to wait before each, so that other work on the machine can finish
+
+
+# Each group yields cases as (name, function, calls per round, rounds). The runner times a case
+# as soon as it is yielded, before the group sets up the next one or cleans up.
+
+def calculator_cases():
+    """Cases for each operator and kind of number."""
+    for kind, num1, num2 in NUMBERS:
+        for operator in OPERATORS:
+            yield (f"calculator.calculate {kind} {operator}",
+                   lambda: format_number(arithmetic(num1, num2, operator, DEFAULT_PRECISION), DEFAULT_PRECISION), 2000, 5)
+
+
+def password_cases():
+    """Cases for each length and set of character types."""
+    for class_name, flags in CLASS_SETS:
+        classes = character_classes(*flags)
+        for length in PASSWORD_LENGTHS:
+            yield f"password.generate {class_name} {length}", lambda: make_password(length, classes), 500, 5
+
+
+def make_tasks(size):
+    return [Task(f"Task number {i} for the benchmark", i % 3 == 0) for i in range(size)]
+
+
+def todo_cases(sizes, directory):
+    """Cases for each task operation and list size."""
+    for size in sizes:
+        path = os.path.join(directory, f"tasks_{size}.json")
+        tasks = make_tasks(size)
+        storage = JournalStorage(path)
+        storage.save(tasks)
+        index = TaskIndex()
+        index.rebuild(tasks)
+        middle = size // 2
+
+        # The same steps as TodoApp.insert_task, change_task and remove_task, without the listbox
+        def add():
+            position = len(tasks)
+            tasks.append(Task("benchmark task", False))
+            index.insert(position, tasks[position])
+            storage.record("add", position, tasks[position])
+
+        def update():
+            tasks[middle] = Task("edited task", not tasks[middle].completed)
+            index.update(middle, tasks[middle])
+            storage.record("update", middle, tasks[middle])
+
+        def delete():
+            del tasks[middle]
+            index.remove(middle)
+            storage.record("delete", middle)
+
+        def load():
+            loader = JournalStorage(path)
+            TaskIndex().rebuild(loader.load())
+            loader.close()
+
+        yield f"todo.add {size}", add, 200, 5
+        yield f"todo.update {size}", update, 200, 5
+        yield f"todo.delete {size}", delete, 200, 5
+        yield f"todo.save {size}", lambda: storage.save(tasks), 3, 5
+        yield f"todo.load {size}", load, 3, 5
+        storage.close()
+
+
+def gui_cases(sizes, directory):
+    """Cases for the app callbacks on real widgets; skipped without a display."""
+    calculator = load_script("calculator.py", "calculator_app")
+    passwords = load_script("password generator.py", "password_app")
+    todo = load_script("to do list aditya.py", "todo_app")
+    for module in (calculator, passwords, todo):
+        module.load_tkinter()
+        for name in ("showinfo", "showwarning", "showerror"):
+            setattr(module.messagebox, name, lambda *args, **kwargs: None)
+    tk = todo.tk
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"Skipping the GUI cases, Tk cannot open a window: {e}", file=sys.stderr)
+        return
+    root.withdraw()
+
+    app = calculator.CalculatorApp(tk.Toplevel(root))
+    for kind, num1, num2 in NUMBERS:
+        app.num1_entry.delete(0, tk.END)
+        app.num1_entry.insert(0, num1)
+        app.num2_entry.delete(0, tk.END)
+        app.num2_entry.insert(0, num2)
+        for operator in OPERATORS:
+            yield f"gui.calculator.calculate {kind} {operator}", lambda: app.calculate(operator), 500, 5
+
+    app = passwords.PasswordGeneratorApp(tk.Toplevel(root), blocklist_path=os.path.join(directory, "none.bloom"))
+    for length in PASSWORD_LENGTHS:
+        app.length_entry.delete(0, tk.END)
+        app.length_entry.insert(0, str(length))
+        yield f"gui.password.generate_password all {length}", app.generate_password, 200, 5
+
+    for size in sizes:
+        path = os.path.join(directory, f"gui_tasks_{size}.json")
+        JournalStorage(path).save(make_tasks(size))
+        window = tk.Toplevel(root)
+        app = todo.TodoApp(window, storage=JournalStorage(path))
+        middle = size // 2
+
+        def select_middle():
+            app.task_listbox.selection_clear()
+            app.task_listbox.selection_set(middle)
+
+        def add():
+            app.task_entry.insert(0, "benchmark task")
+            app.add_task()
+
+        def update():
+            select_middle()
+            app.task_entry.insert(0, "edited task")
+            app.update_task()
+
+        def delete():
+            select_middle()
+            app.delete_task()
+
+        yield f"gui.todo.add_task {size}", add, 100, 5
+        yield f"gui.todo.update_task {size}", update, 100, 5
+        yield f"gui.todo.delete_task {size}", delete, 100, 5
+        yield f"gui.todo.save_tasks {size}", lambda: (app.save_tasks(), app.storage.flush()), 3, 5
+        yield f"gui.todo.load_tasks {size}", app.load_tasks, 3, 5
+        app.storage.close()
+        window.destroy()
+    root.destroy()
+
+
+def case_threshold(name, threshold, disk_threshold):
+    """Returns the slowdown that counts as a regression for the named case."""
+    return disk_threshold if name.startswith(DISK_BOUND) else threshold
+
+
+def compare(results, baseline, threshold, disk_threshold):
+    """
+    Prints each case next to its baseline time.
+    :return: Names of the cases that got slower by more than their threshold.
+    """
+    regressions = []
+    print(f"{'baseline':>10} {'current':>10} {'change':>8}  case (us/op)")
+    for name, current in results.items():
+        if name not in baseline:
+            print(f"{'':>10} {current:>10.2f} {'new':>8}  {name}")
+            continue
+        change = current / baseline[name] - 1
+        flag = ""
+        if change > case_threshold(name, threshold, disk_threshold):
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -case_threshold(name, threshold, disk_threshold):
+            flag = "  faster"
+        print(f"{baseline[name]:>10.2f} {current:>10.2f} {change:>+8.1%}  {name}{flag}")
+    return regressions
+
+
+def run_cases(args, directory, baseline):
+    """
+    Times every selected case.
+    :param directory: Scratch directory for the files the cases create.
+    :param baseline: Results to compare with, or None to print each result as soon as it is measured.
+    :return: Dict mapping case name to microseconds per operation.
+    """
+    groups = [calculator_cases(), password_cases(), todo_cases(args.sizes, directory)]
+    if args.gui:
+        groups.append(gui_cases(args.sizes, directory))
+
+    results = {}
+    for group in groups:
+        for name, func, repeat, rounds in group:
+            if args.only and not name.startswith(tuple(args.only)):
+                continue
+            result = best_time(func, repeat, rounds)
+            if baseline is None:
+                print(f"{result:>12.2f}  {name}")
+            elif name in baseline:
+                limit = baseline[name] * (1 + case_threshold(name, args.threshold, args.disk_threshold))
+                for _ in range(RETRIES):
+                    if result <= limit:
+                        break
+                    time.sleep(RETRY_PAUSE)
+                    result = min(result, best_time(func, repeat, rounds)) # Was the machine just busy?
+            results[name] = result
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare against results saved with --output.")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help=f"Slowdown that counts as a regression (default: {THRESHOLD}, i.e. 10%%).")
+    parser.add_argument("--disk-threshold", type=float, default=DISK_THRESHOLD,
+                        help=f"The same for the cases that wait for the disk (default: {DISK_THRESHOLD}, i.e. 50%%).")
+    parser.add_argument("--sizes", type=int, nargs="+", default=TODO_SIZES, help="Task list sizes for the to-do cases.")
+    parser.add_argument("--only", nargs="+", default=[], help="Only run cases whose name starts with one of these.")
+    parser.add_argument("--gui", action="store_true", help="Also time the app callbacks on real Tk widgets.")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare, "r") as f:
+                baseline = json.load(f)["results"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error: Could not read the baseline {args.compare}: {e}", file=sys.stderr)
+            return 1
+
+    output = os.path.abspath(args.output) if args.output else None
+    start = os.getcwd()
+    # Run from a scratch directory so no case touches the real tasks.json or blocklist
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            results = run_cases(args, directory, baseline)
+        finally:
+            os.chdir(start) # The directory cannot be removed while it is the working directory
+
+    if output:
+        report = {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "unit": "us/op",
+            "results": results,
+        }
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold, args.disk_threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) above {args.threshold:.0%} "
+                  f"({args.disk_threshold:.0%} for disk-bound cases).")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
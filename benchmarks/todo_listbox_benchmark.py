@@ -0,0 +1,99 @@
+"""
+Measures the per-operation cost of the TodoApp button callbacks as the task list grows.
+
+With the incremental row updates and the virtualized listbox, the add/update/
+toggle/delete, redraw and scroll timings should all stay flat across sizes.
+Needs a display, since it creates real Tk widgets.
+
+Usage: python benchmarks/todo_listbox_benchmark.py
+"""
+import itertools
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _common import load_script, time_call
+
+SIZES = [100, 1000, 10000, 100000]
+REPEAT = 200
+
+
+def make_app(todo, root, size):
+    """Creates a TodoApp filled with size tasks, with saving and popups disabled."""
+    app = todo.TodoApp(root)
+    app.save_change = lambda op, index: None # Keep disk I/O out of the numbers
+    app.tasks = [todo.Task(f"Task {i}", i % 3 == 0) for i in range(size)]
+    app.index.rebuild(app.tasks)
+    app.update_task_listbox()
+    return app
+
+
+def bench_size(todo, root, size):
+    app = make_app(todo, root, size)
+    middle = size // 2
+    results = {}
+
+    def add():
+        app.task_entry.insert(0, "benchmark task")
+        app.add_task()
+
+    results["add_task"] = time_call(add, REPEAT)
+
+    def update():
+        app.task_listbox.selection_clear()
+        app.task_listbox.selection_set(middle)
+        app.task_entry.insert(0, "edited")
+        app.update_task()
+
+    results["update_task"] = time_call(update, REPEAT)
+
+    def toggle():
+        app.task_listbox.selection_clear()
+        app.task_listbox.selection_set(middle)
+        app.mark_complete()
+
+    results["mark_complete"] = time_call(toggle, REPEAT)
+
+    def delete():
+        app.task_listbox.selection_clear()
+        app.task_listbox.selection_set(middle)
+        app.delete_task()
+
+    results["delete_task"] = time_call(delete, REPEAT)
+    results["full_rebuild"] = time_call(app.update_task_listbox, 20)
+
+    positions = itertools.count(0, 337) # Jump around the list so most scrolls leave the overscan
+    results["scroll"] = time_call(lambda: app.task_listbox.on_scrollbar("moveto", (next(positions) % 1000) / 1000), REPEAT)
+
+    for child in root.winfo_children():
+        child.destroy()
+    return results
+
+
+def main():
+    # Run from a scratch directory so a stray save never touches the real tasks.json
+    os.chdir(tempfile.mkdtemp())
+    todo = load_script("to do list aditya.py", "todo_app")
+    todo.load_tkinter()
+    todo.messagebox.showinfo = lambda *args, **kwargs: None
+    todo.messagebox.showwarning = lambda *args, **kwargs: None
+
+    try:
+        root = todo.tk.Tk()
+    except todo.tk.TclError as e:
+        print(f"Cannot open a Tk window ({e}); this benchmark needs a display.")
+        return 1
+    root.withdraw()
+
+    print(f"{'tasks':>8} {'add_task':>10} {'update_task':>12} {'mark_complete':>14} {'delete_task':>12} {'full_rebuild':>13} {'scroll':>8}  (us/op)")
+    for size in SIZES:
+        r = bench_size(todo, root, size)
+        print(f"{size:>8} {r['add_task']:>10.1f} {r['update_task']:>12.1f} {r['mark_complete']:>14.1f} {r['delete_task']:>12.1f} {r['full_rebuild']:>13.1f} {r['scroll']:>8.1f}")
+
+    root.destroy()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Compares the memory use and speed of Task objects against the old task dicts.
+
+For each size it measures the memory held by the task list, the time to build
+it, to flip every completed flag, and to convert it to and from the tasks.json
+layout. Runs headless.
+
+Usage: python benchmarks/todo_model_benchmark.py [--sizes 10000 100000 1000000]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from todo_model import Task, tasks_from_json, tasks_to_json
+
+
+def make_dicts(size):
+    return [{"task": f"Task number {i}", "completed": i % 3 == 0} for i in range(size)]
+
+
+def make_objects(size):
+    return [Task(f"Task number {i}", i % 3 == 0) for i in range(size)]
+
+
+def toggle_dicts(tasks):
+    for task in tasks:
+        task["completed"] = not task["completed"]
+
+
+def toggle_objects(tasks):
+    for task in tasks:
+        task.completed = not task.completed
+
+
+def measure_memory(make, size):
+    """Returns the bytes held by the list built by make(size), text strings included."""
+    gc.collect()
+    tracemalloc.start()
+    tasks = make(size)
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del tasks
+    return used
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def bench(size):
+    results = {}
+    for name, make, toggle, to_json, from_json in (
+        ("dict", make_dicts, toggle_dicts, lambda tasks: tasks, lambda data: data),
+        ("Task", make_objects, toggle_objects, tasks_to_json, tasks_from_json),
+    ):
+        build_time, tasks = timed(make, size)
+        toggle_time, _ = timed(toggle, tasks)
+        dump_time, text = timed(lambda: json.dumps(to_json(tasks)))
+        load_time, _ = timed(lambda: from_json(json.loads(text)))
+        results[name] = {
+            "memory_mb": measure_memory(make, size) / 1e6,
+            "build_s": build_time,
+            "toggle_s": toggle_time,
+            "dump_s": dump_time,
+            "load_s": load_time,
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    args = parser.parse_args(argv)
+
+    print(f"{'tasks':>9} {'model':>5} {'memory MB':>10} {'build s':>8} {'toggle s':>9} {'dump s':>7} {'load s':>7}")
+    for size in args.sizes:
+        for name, r in bench(size).items():
+            print(f"{size:>9} {name:>5} {r['memory_mb']:>10.1f} {r['build_s']:>8.3f} {r['toggle_s']:>9.3f} {r['dump_s']:>7.3f} {r['load_s']:>7.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
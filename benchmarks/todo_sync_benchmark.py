@@ -0,0 +1,68 @@
+"""
+Measures what keeping a window in sync with other writers of tasks.json costs.
+
+Two JournalStorage objects share one task file, as two windows (or a window
+and todo_cli.py) would. For each size it times a poll() when nothing changed,
+a poll() that picks up one change the other object made, and a record() by
+the other object, against reading the whole file again with load(). The
+polls should stay flat as the list grows, only load() should not. Runs headless.
+
+Usage: python benchmarks/todo_sync_benchmark.py [--sizes 1000 10000 100000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _common import REPO_DIR, time_call
+
+sys.path.insert(0, REPO_DIR)
+from todo_model import Task
+from todo_storage import JournalStorage
+
+REPEAT = 200
+
+
+def bench(directory, size):
+    path = os.path.join(directory, f"tasks_{size}.json")
+    JournalStorage(path).save([Task(f"Task number {i}", i % 3 == 0) for i in range(size)])
+    window = JournalStorage(path, compact_every=REPEAT * 10) # No compaction during the run
+    other = JournalStorage(path, compact_every=REPEAT * 10)
+    window.load()
+    other.load()
+    middle = size // 2
+    results = {"poll_idle": time_call(window.poll, REPEAT)}
+
+    def change():
+        other.record("update", middle, Task("Changed elsewhere", True))
+
+    def change_and_poll():
+        change()
+        window.poll()
+
+    record = time_call(change, REPEAT)
+    window.poll()
+    results["record"] = record
+    results["poll_change"] = time_call(change_and_poll, REPEAT) - record
+    results["load"] = time_call(JournalStorage(path).load, 5)
+    window.close()
+    other.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args(argv)
+
+    print(f"{'tasks':>8} {'poll idle':>10} {'poll change':>12} {'record':>10} {'full load':>12}  (us/op)")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            r = bench(directory, size)
+            print(f"{size:>8} {r['poll_idle']:>10.1f} {r['poll_change']:>12.1f} {r['record']:>10.1f} {r['load']:>12.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,37 @@
-import tkinter as tk
-from tkinter import messagebox
+from calculator_engine import ExpressionError, evaluate
+from calculator_numbers import DEFAULT_PRECISION, PRECISIONS, arithmetic, format_number
+from ui_metrics import start_metrics
+
+# tkinter is only imported when a window is opened (see load_tkinter); the maths lives in
+# calculator_engine and calculator_numbers, which never import it.
+tk = None
+messagebox = None
+
+# Button callbacks timed when the app runs with --metrics (see ui_metrics)
+CALLBACKS = ("calculate", "evaluate_expression", "clear_inputs")
+
+
+def load_tkinter():
+    """Imports tkinter into this module on first use."""
+    global tk, messagebox
+    if tk is not None:
+        return
+    import tkinter
+    from tkinter import messagebox as tk_messagebox
+    tk, messagebox = tkinter, tk_messagebox
 
 class CalculatorApp:
     def __init__(self, master):
         """
         Initializes the Calculator application.
-        :param master: The Tkinter root window.
+        :param master: The window (Tk root or Toplevel) or any other widget to build the app in.
         """
+        load_tkinter()
         self.master = master
-        master.title("Simple Python Calculator")
-        master.geometry("350x450") # Set a fixed size for the window
-        master.resizable(False, False) # Make the window not resizable
+        if isinstance(master, tk.Wm): # Not when placed in a frame, e.g. a tab
+            master.title("Simple Python Calculator")
+            master.geometry("350x560") # Set a fixed size for the window
+            master.resizable(False, False) # Make the window not resizable
 
         # Configure a modern look for the window
         master.configure(bg="#f0f2f5") # Light gray background
@@ -34,6 +55,29 @@ class CalculatorApp:
         )
         self.result_label.pack(pady=20, padx=20, fill="x") # Pack with padding and fill horizontally
 
+        # Expression input, e.g. "2 * (3 + sqrt(16))^2"; press Enter or "=" to evaluate
+        expression_frame = tk.Frame(master, bg="#f0f2f5")
+        expression_frame.pack(pady=5, padx=20, fill="x")
+
+        self.expression_entry = tk.Entry(
+            expression_frame,
+            font=("Inter", 16),
+            bd=2,
+            relief="solid",
+            justify="right",
+            bg="white",
+            fg="#333333"
+        )
+        self.expression_entry.pack(side="left", fill="x", expand=True)
+        self.expression_entry.bind("<Return>", lambda event: self.evaluate_expression())
+
+        self.equals_button = tk.Button(
+            expression_frame, text="=", font=("Inter", 16, "bold"), bg="#4CAF50", fg="white",
+            activebackground="#45a049", command=self.evaluate_expression,
+            width=3, relief="raised", bd=2, cursor="hand2"
+        )
+        self.equals_button.pack(side="right", padx=(5, 0))
+
         # Input fields
         self.num1_entry = tk.Entry(
             master,
@@ -107,6 +151,14 @@ class CalculatorApp:
         )
         self.clear_button.pack(pady=10)
 
+        # Significant digits shown for results that are not whole numbers
+        precision_frame = tk.Frame(master, bg="#f0f2f5")
+        precision_frame.pack()
+        tk.Label(precision_frame, text="Digits:", font=("Inter", 12), bg="#f0f2f5", fg="#333333").pack(side="left")
+        self.precision_var = tk.IntVar(value=DEFAULT_PRECISION)
+        self.precision_menu = tk.OptionMenu(precision_frame, self.precision_var, *PRECISIONS)
+        self.precision_menu.pack(side="left", padx=5)
+
     def calculate(self, operator):
         """
         Performs the arithmetic calculation based on the selected operator.
@@ -121,26 +173,16 @@ class CalculatorApp:
                 messagebox.showwarning("Input Error", "Please enter both numbers.")
                 return
 
-            num1 = float(num1_str)
-            num2 = float(num2_str)
-
-            result = 0
-            if operator == '+':
-                result = num1 + num2
-            elif operator == '-':
-                result = num1 - num2
-            elif operator == '*':
-                result = num1 * num2
-            elif operator == '/':
-                if num2 == 0:
-                    messagebox.showerror("Math Error", "Cannot divide by zero!")
-                    self.result_var.set("Error")
-                    return
-                result = num1 / num2
-            
-            # Display result, formatted to avoid excessive decimal places
-            self.result_var.set(f"{result:.8f}".rstrip('0').rstrip('.'))
+            # Floats when they give the right digits, otherwise exact int, Fraction or Decimal maths
+            result = arithmetic(num1_str, num2_str, operator, self.precision_var.get())
+            self.result_var.set(self.format_result(result))
 
+        except ZeroDivisionError:
+            messagebox.showerror("Math Error", "Cannot divide by zero!")
+            self.result_var.set("Error")
+        except OverflowError:
+            messagebox.showerror("Math Error", "The result is too large.")
+            self.result_var.set("Error")
         except ValueError:
             messagebox.showerror("Input Error", "Invalid input. Please enter valid numbers.")
             self.result_var.set("Error")
@@ -148,6 +190,41 @@ class CalculatorApp:
             messagebox.showerror("An Error Occurred", f"Something went wrong: {e}")
             self.result_var.set("Error")
 
+    def evaluate_expression(self):
+        """
+        Evaluates the full expression typed into the expression field.
+        Parsed expressions are cached, so repeating a formula skips parsing.
+        """
+        expression = self.expression_entry.get().strip()
+        if not expression:
+            messagebox.showwarning("Input Error", "Please enter an expression.")
+            return
+        try:
+            self.result_var.set(self.format_result(evaluate(expression)))
+        except ZeroDivisionError:
+            messagebox.showerror("Math Error", "Cannot divide by zero!")
+            self.result_var.set("Error")
+        except ExpressionError as e:
+            messagebox.showerror("Input Error", str(e))
+            self.result_var.set("Error")
+        except OverflowError:
+            messagebox.showerror("Math Error", "The result is too large.")
+            self.result_var.set("Error")
+        except ValueError as e:
+            messagebox.showerror("Math Error", f"Invalid operation: {e}")
+            self.result_var.set("Error")
+        except Exception as e:
+            messagebox.showerror("An Error Occurred", f"Something went wrong: {e}")
+            self.result_var.set("Error")
+
+    def format_result(self, result):
+        """
+        Formats a result for the display with the chosen number of significant digits.
+        Whole numbers are shown in full, very small or large results in scientific notation.
+        :param result: The number to show.
+        """
+        return format_number(result, self.precision_var.get())
+
     def clear_inputs(self):
         """
         Clears the input fields and resets the result display.
@@ -156,10 +233,13 @@ class CalculatorApp:
         self.num1_entry.insert(0, "0") # Reset to 0
         self.num2_entry.delete(0, tk.END)
         self.num2_entry.insert(0, "0") # Reset to 0
+        self.expression_entry.delete(0, tk.END)
         self.result_var.set("0")
 
 # Main part of the script to run the application
 if __name__ == "__main__":
+    load_tkinter()
     root = tk.Tk()
+    start_metrics(root, CalculatorApp, CALLBACKS)
     app = CalculatorApp(root)
     root.mainloop()
@@ -0,0 +1,308 @@
+"""
+Batch evaluation of calculator expressions over columns of numbers.
+
+evaluate_batch() applies one expression to every row of a set of input columns,
+e.g. "price * qty * (1 + tax / 100)" over three columns of a CSV file. When NumPy
+is installed the whole column is computed at once with array operations;
+otherwise a tight pure-Python loop over the compiled expression is used.
+
+Errors are reported per row instead of with popups, using the same wording as
+the calculator window: "Cannot divide by zero!", "Invalid input. Please enter
+valid numbers." and so on. Rows with an error get no value. The vectorized path
+recomputes every row where some step gave inf or nan with the pure-Python code,
+so both paths report the same error for the same row.
+
+Command line:
+    python calculator_batch.py "price * qty" orders.csv -o totals.csv
+"""
+import argparse
+import csv
+import math
+import sys
+from functools import reduce
+from itertools import islice
+
+from calculator_engine import ExpressionError, build, compile_expression
+
+try:
+    import numpy as np
+except ImportError: # NumPy is optional, the pure-Python loop is used without it
+    np = None
+
+CHUNK_ROWS = 100000 # Rows read from a CSV file at a time
+EPSILON = sys.float_info.epsilon
+
+DIVIDE_BY_ZERO = "Cannot divide by zero!"
+INVALID_INPUT = "Invalid input. Please enter valid numbers."
+TOO_LARGE = "The result is too large."
+
+
+class BatchResult:
+    """The outcome of evaluate_batch()."""
+
+    def __init__(self, values, errors):
+        """
+        :param values: One result per row; None (or NaN for NumPy arrays) where the row failed.
+        :param errors: Dict mapping row number to error message.
+        """
+        self.values = values
+        self.errors = errors
+
+    def __len__(self):
+        return len(self.values)
+
+    def rows(self):
+        """Yields (value, error) per row, with value None for failed rows."""
+        for row, value in enumerate(self.values):
+            error = self.errors.get(row)
+            yield (None if error else float(value)), error
+
+
+def evaluate_batch(expression, columns, use_numpy=True):
+    """
+    Evaluates expression once per row of the given columns.
+    :param expression: Calculator expression; its variable names select the columns.
+    :param columns: Dict mapping variable names to equally long lists of numbers or
+        number strings, or NumPy arrays. Extra columns are ignored.
+    :param use_numpy: Set to False to force the pure-Python loop.
+    :return: A BatchResult.
+    :raises ExpressionError: If the expression is invalid or a needed column is missing.
+    """
+    compiled = compile_expression(expression)
+    missing = compiled.variables.difference(columns)
+    if missing:
+        raise ExpressionError(f"No column given for: {', '.join(sorted(missing))}.")
+    lengths = {len(columns[name]) for name in compiled.variables}
+    if len(lengths) > 1:
+        raise ExpressionError("All input columns must have the same length.")
+    if not compiled.variables:
+        raise ExpressionError("The expression does not use any column.")
+    size = lengths.pop()
+    inputs = {name: columns[name] for name in compiled.variables}
+    if use_numpy and np is not None:
+        return evaluate_numpy(compiled, inputs, size)
+    return evaluate_python(compiled, inputs, size)
+
+
+def to_float(value):
+    """Converts one input cell to a float, raising ValueError for anything that is not a finite number."""
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            raise ValueError("empty value")
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError("not a finite number")
+    return value
+
+
+def evaluate_row(function, env):
+    """
+    Evaluates a compiled expression for one row of numbers.
+    :return: (result, None), or (None, error message) like the calculator window shows it.
+    """
+    try:
+        result = function(env)
+    except ZeroDivisionError:
+        return None, DIVIDE_BY_ZERO
+    except OverflowError:
+        return None, TOO_LARGE
+    except (ValueError, TypeError) as e:
+        return None, f"Invalid operation: {e}"
+    if not math.isfinite(result):
+        return None, TOO_LARGE
+    return result, None
+
+
+def evaluate_python(compiled, inputs, size):
+    """Pure-Python evaluation: one call of the compiled closure per row."""
+    function = compiled.function
+    names = list(inputs)
+    values = [None] * size
+    errors = {}
+    env = {}
+    for row, cells in enumerate(zip(*[inputs[name] for name in names])):
+        try:
+            for name, cell in zip(names, cells):
+                env[name] = to_float(cell)
+        except (TypeError, ValueError):
+            errors[row] = INVALID_INPUT
+            continue
+        values[row], error = evaluate_row(function, env)
+        if error:
+            errors[row] = error
+    return BatchResult(values, errors)
+
+
+def numpy_column(values):
+    """
+    Converts a column to a float64 array.
+    :return: (array, mask of rows that were not valid numbers)
+    """
+    try:
+        array = np.asarray(values, dtype=np.float64)
+        return array, ~np.isfinite(array)
+    except (TypeError, ValueError):
+        pass
+    # Some cells are not numbers, so convert them one by one and remember which
+    array = np.empty(len(values), dtype=np.float64)
+    invalid = np.zeros(len(values), dtype=bool)
+    for row, value in enumerate(values):
+        try:
+            array[row] = to_float(value)
+        except (TypeError, ValueError):
+            array[row] = 0.0
+            invalid[row] = True
+    return array, invalid
+
+
+def numpy_functions(suspect):
+    """
+    Returns the operator and function tables used to build a NumPy version of an expression.
+    Every step marks the rows where it gave inf or nan in the suspect mask; the pure-Python
+    code may raise an error for those rows instead.
+    """
+    def checked(function):
+        def wrapper(*args):
+            result = function(*args)
+            np.logical_or(suspect, ~np.isfinite(result), out=suspect)
+            return result
+        return wrapper
+
+    ln = checked(np.log)
+
+    def log(x, base=None):
+        return ln(x) if base is None else ln(x) / ln(base) # ln(0) of the base would vanish in the quotient
+
+    def round_(x, digits=0):
+        if np.ndim(digits) != 0 or not abs(digits) <= 300 or digits != int(digits):
+            suspect[:] = True # Digits from a column, huge or not whole: leave every row to the pure-Python round
+            return x
+        scaled = np.abs(x) * 10.0 ** int(digits)
+        # round() rounds the exact value of x, np.round() the scaled one; they can differ next to a half
+        np.logical_or(suspect, np.abs(scaled - np.floor(scaled) - 0.5) <= 4 * EPSILON * scaled, out=suspect)
+        return np.round(x, int(digits))
+
+    operators = {
+        "+": np.add,
+        "-": np.subtract,
+        "*": np.multiply,
+        "/": np.true_divide,
+        "%": np.mod,
+        "^": np.power,
+    }
+    functions = {
+        "sqrt": np.sqrt,
+        "abs": np.abs,
+        "round": round_,
+        "floor": np.floor,
+        "ceil": np.ceil,
+        "exp": np.exp,
+        "ln": np.log,
+        "log": log,
+        "log10": np.log10,
+        "log2": np.log2,
+        "sin": np.sin,
+        "cos": np.cos,
+        "tan": np.tan,
+        "asin": np.arcsin,
+        "acos": np.arccos,
+        "atan": np.arctan,
+        "min": lambda *args: reduce(np.minimum, args),
+        "max": lambda *args: reduce(np.maximum, args),
+    }
+    return ({op: checked(function) for op, function in operators.items()},
+            {name: checked(function) for name, function in functions.items()})
+
+
+def evaluate_numpy(compiled, inputs, size):
+    """
+    Vectorized evaluation: the expression runs once on whole columns. Rows where a step
+    gave inf or nan are then evaluated again one by one, as the pure-Python loop does.
+    """
+    env = {}
+    invalid = np.zeros(size, dtype=bool)
+    for name, values in inputs.items():
+        env[name], bad = numpy_column(values)
+        invalid |= bad
+    suspect = np.zeros(size, dtype=bool)
+    operators, functions = numpy_functions(suspect)
+    with np.errstate(all="ignore"):
+        result = build(compiled.tree, operators, functions)(env)
+    result = np.broadcast_to(np.asarray(result, dtype=np.float64), (size,)).copy()
+
+    errors = {}
+    for row in np.flatnonzero(invalid):
+        errors[int(row)] = INVALID_INPUT # Checked first, as in the pure-Python loop
+    function = compiled.function
+    for row in np.flatnonzero(suspect & ~invalid):
+        value, error = evaluate_row(function, {name: float(array[row]) for name, array in env.items()})
+        if error:
+            errors[int(row)] = error
+        else:
+            result[row] = value
+    result[list(errors)] = np.nan
+    return BatchResult(result, errors)
+
+
+def evaluate_csv(expression, input_file, output_file, result_column="result", use_numpy=True):
+    """
+    Evaluates expression for every row of a CSV file with a header row, in chunks of CHUNK_ROWS.
+    The output has the input columns plus the result column and an "error" column.
+    :return: (number of rows, number of rows with errors)
+    """
+    reader = csv.reader(input_file)
+    header = next(reader, None)
+    if header is None:
+        raise ExpressionError("The CSV file is empty.")
+    positions = {name: i for i, name in enumerate(header)}
+    needed = compile_expression(expression).variables
+    missing = needed.difference(positions)
+    if missing:
+        raise ExpressionError(f"The CSV file has no column named: {', '.join(sorted(missing))}.")
+    writer = csv.writer(output_file)
+    writer.writerow(header + [result_column, "error"])
+
+    total = failed = 0
+    while True:
+        chunk = list(islice(reader, CHUNK_ROWS))
+        if not chunk:
+            break
+        columns = {name: [row[positions[name]] if positions[name] < len(row) else "" for row in chunk]
+                   for name in needed}
+        result = evaluate_batch(expression, columns, use_numpy)
+        for row, (value, error) in zip(chunk, result.rows()):
+            writer.writerow(row + ["" if value is None else repr(value), error or ""])
+        total += len(chunk)
+        failed += len(result.errors)
+    return total, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply a calculator expression to every row of a CSV file.")
+    parser.add_argument("expression", help='Expression using column names as variables, e.g. "price * qty".')
+    parser.add_argument("input", help="CSV file with a header row, or - for standard input.")
+    parser.add_argument("-o", "--output", default="-", help="CSV file to write (default: standard output).")
+    parser.add_argument("--column", default="result", help="Name of the result column (default: result).")
+    parser.add_argument("--no-numpy", action="store_true", help="Use the pure-Python loop even if NumPy is installed.")
+    args = parser.parse_args(argv)
+
+    input_file = output_file = None
+    try:
+        input_file = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+        output_file = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+        total, failed = evaluate_csv(args.expression, input_file, output_file, args.column, not args.no_numpy)
+    except (ExpressionError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if input_file not in (None, sys.stdin):
+            input_file.close()
+        if output_file not in (None, sys.stdout):
+            output_file.close()
+    print(f"Evaluated {total} rows, {failed} with errors.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,373 @@
+"""
+Expression engine for the calculator.
+
+Expressions such as "2 * (3 + sqrt(16))^2 - -1" are tokenized and parsed into a
+small syntax tree, which is then compiled into nested Python closures. Nothing
+is ever passed to eval(). Compiled expressions are kept in an LRU cache keyed by
+the expression text, so evaluating the same formula again skips parsing.
+
+Supported syntax:
+    numbers       12, 3.5, .5, 1e-3 (whole numbers without a point or exponent stay exact ints)
+    operators     + - * / % and ^ or ** for powers (right associative)
+    unary minus   -x, 2^-1
+    parentheses   (1 + 2) * 3
+    functions     sqrt, abs, round, floor, ceil, exp, ln, log, log10, log2,
+                  sin, cos, tan, asin, acos, atan, min, max
+    constants     pi, e, tau
+    variables     any other name, given as keyword arguments to evaluate()
+
+The module has no GUI dependency and can be used from the command line:
+
+    python calculator_engine.py "2 * (3 + sqrt(16))^2" --digits 12
+"""
+import argparse
+import math
+import operator
+import re
+import sys
+from functools import lru_cache
+
+from calculator_numbers import DEFAULT_PRECISION, format_number
+
+CACHE_SIZE = 256 # Number of compiled expressions kept
+
+TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+      | (?P<name>[A-Za-z_][A-Za-z_0-9]*)
+      | (?P<op>\*\*|[-+*/%^(),])
+    )""", re.VERBOSE)
+
+
+MAX_POWER_BITS = 100000 # Integer powers with larger results (about 30,000 digits) are computed as floats
+
+
+def power(base, exponent):
+    """Like base ** exponent, but a negative base with a fractional exponent is an error, not a complex number."""
+    # Estimate the size of an exact result from the bits of the base, so (9^9999)^9999 cannot run for minutes;
+    # as a float it overflows at once instead
+    if isinstance(base, int) and isinstance(exponent, int) and \
+            exponent * (abs(base).bit_length() - 1) > MAX_POWER_BITS:
+        base = float(base)
+    result = base ** exponent
+    if isinstance(result, complex):
+        raise ValueError("math domain error")
+    return result
+
+
+def round_number(x, digits=0):
+    """Like round(), but a digits value that is not a whole number is an error, not a TypeError."""
+    if digits != int(digits):
+        raise ValueError("round() needs a whole number of digits")
+    return round(x, int(digits))
+
+
+BINARY_OPERATORS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "%": operator.mod,
+    "^": power,
+}
+
+FUNCTIONS = {
+    "sqrt": math.sqrt,
+    "abs": abs,
+    "round": round_number,
+    "floor": math.floor,
+    "ceil": math.ceil,
+    "exp": math.exp,
+    "ln": math.log,
+    "log": math.log, # log(x) is the natural log, log(x, base) uses the given base
+    "log10": math.log10,
+    "log2": math.log2,
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+    "asin": math.asin,
+    "acos": math.acos,
+    "atan": math.atan,
+    "min": min,
+    "max": max,
+}
+
+ARGUMENT_COUNTS = { # (fewest, most) arguments of each function; None means no limit
+    "round": (1, 2),
+    "log": (1, 2),
+    "min": (2, None),
+    "max": (2, None),
+} # All other functions take exactly one argument
+
+CONSTANTS = {
+    "pi": math.pi,
+    "e": math.e,
+    "tau": math.tau,
+}
+
+
+class ExpressionError(ValueError):
+    """Raised for expressions that cannot be parsed, or for missing variables."""
+
+
+def tokenize(text):
+    """
+    Splits an expression into a list of (kind, value, position) tuples.
+    kind is "number", "name" or "op"; the list ends with an ("end", None, position) token.
+    """
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN_PATTERN.match(text, position)
+        if match is None:
+            bad = text[position:].lstrip()
+            raise ExpressionError(f"Unexpected character '{bad[0]}' at position {len(text) - len(bad) + 1}.")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if value == "**":
+            value = "^"
+        tokens.append((kind, value, match.start(kind) + 1))
+        position = match.end()
+    tokens.append(("end", None, len(text) + 1))
+    return tokens
+
+
+class Parser:
+    """
+    Recursive descent parser producing a tree of tuples:
+    ("num", value), ("var", name), ("neg", operand), ("bin", op, left, right), ("call", name, args)
+    """
+
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position]
+
+    def next(self):
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def expect(self, value):
+        kind, token_value, position = self.next()
+        if token_value != value:
+            found = "end of expression" if kind == "end" else f"'{token_value}'"
+            raise ExpressionError(f"Expected '{value}' but found {found} at position {position}.")
+
+    def parse(self):
+        tree = self.parse_sum()
+        kind, value, position = self.peek()
+        if kind != "end":
+            raise ExpressionError(f"Unexpected '{value}' at position {position}.")
+        return tree
+
+    def parse_sum(self):
+        tree = self.parse_product()
+        while self.peek()[1] in ("+", "-") and self.peek()[0] == "op":
+            op = self.next()[1]
+            tree = ("bin", op, tree, self.parse_product())
+        return tree
+
+    def parse_product(self):
+        tree = self.parse_unary()
+        while self.peek()[1] in ("*", "/", "%") and self.peek()[0] == "op":
+            op = self.next()[1]
+            tree = ("bin", op, tree, self.parse_unary())
+        return tree
+
+    def parse_unary(self):
+        # Unary minus binds looser than ^, so -2^2 is -(2^2) like in written maths
+        if self.peek()[0] == "op" and self.peek()[1] in ("-", "+"):
+            op = self.next()[1]
+            operand = self.parse_unary()
+            return ("neg", operand) if op == "-" else operand
+        return self.parse_power()
+
+    def parse_power(self):
+        base = self.parse_primary()
+        if self.peek()[0] == "op" and self.peek()[1] == "^":
+            self.next()
+            return ("bin", "^", base, self.parse_unary()) # Right associative: 2^3^2 = 2^(3^2)
+        return base
+
+    def parse_primary(self):
+        kind, value, position = self.next()
+        if kind == "number":
+            return ("num", int(value) if value.isdigit() else float(value))
+        if kind == "name":
+            if self.peek()[1] == "(" and self.peek()[0] == "op":
+                if value not in FUNCTIONS:
+                    raise ExpressionError(f"Unknown function '{value}' at position {position}.")
+                self.next()
+                args = [self.parse_sum()]
+                while self.peek()[1] == ",":
+                    self.next()
+                    args.append(self.parse_sum())
+                self.expect(")")
+                fewest, most = ARGUMENT_COUNTS.get(value, (1, 1))
+                if not fewest <= len(args) <= (most or len(args)):
+                    raise ExpressionError(f"Function '{value}' takes {describe_count(fewest, most)} "
+                                          f"but got {len(args)} at position {position}.")
+                return ("call", value, args)
+            if value in CONSTANTS:
+                return ("num", CONSTANTS[value])
+            if value in FUNCTIONS:
+                raise ExpressionError(f"Function '{value}' needs parentheses, e.g. {value}(2).")
+            return ("var", value)
+        if value == "(":
+            tree = self.parse_sum()
+            self.expect(")")
+            return tree
+        if kind == "end":
+            raise ExpressionError("The expression is incomplete.")
+        raise ExpressionError(f"Unexpected '{value}' at position {position}.")
+
+
+def describe_count(fewest, most):
+    """Describes an argument count for error messages, e.g. "1 to 2 arguments"."""
+    if most is None:
+        return f"at least {fewest} arguments"
+    if fewest == most:
+        return "1 argument" if fewest == 1 else f"{fewest} arguments"
+    return f"{fewest} to {most} arguments"
+
+
+def variables_in(tree):
+    """Returns the set of variable names used in a syntax tree."""
+    kind = tree[0]
+    if kind == "var":
+        return {tree[1]}
+    if kind == "neg":
+        return variables_in(tree[1])
+    if kind == "bin":
+        return variables_in(tree[2]) | variables_in(tree[3])
+    if kind == "call":
+        names = set()
+        for arg in tree[2]:
+            names |= variables_in(arg)
+        return names
+    return set()
+
+
+def build(tree, operators=BINARY_OPERATORS, functions=FUNCTIONS):
+    """
+    Turns a syntax tree into a function taking a dict of variable values.
+    Parts without variables are computed once here (constant folding) unless that fails,
+    in which case the error is left to happen at evaluation time.
+    """
+    kind = tree[0]
+    if kind == "num":
+        value = tree[1]
+        return lambda env: value
+    if kind == "var":
+        name = tree[1]
+        return lambda env: env[name]
+    if kind == "neg":
+        operand = build(tree[1], operators, functions)
+        func = lambda env: -operand(env)
+    elif kind == "bin":
+        op = operators[tree[1]]
+        left = build(tree[2], operators, functions)
+        right = build(tree[3], operators, functions)
+        func = lambda env: op(left(env), right(env))
+    else:
+        function = functions[tree[1]]
+        args = [build(arg, operators, functions) for arg in tree[2]]
+        if len(args) == 1:
+            only = args[0]
+            func = lambda env: function(only(env))
+        else:
+            func = lambda env: function(*[arg(env) for arg in args])
+    if not variables_in(tree):
+        try:
+            value = func({})
+        except (ArithmeticError, ValueError, TypeError):
+            return func
+        return lambda env: value
+    return func
+
+
+class CompiledExpression:
+    """A parsed expression that can be evaluated many times."""
+
+    def __init__(self, text):
+        """
+        :param text: The expression text.
+        :raises ExpressionError: If the text is not a valid expression, or too deeply nested to handle.
+        """
+        self.text = text
+        try:
+            self.tree = Parser(text).parse()
+            self.variables = frozenset(variables_in(self.tree))
+            self.function = build(self.tree)
+        except RecursionError:
+            raise ExpressionError("The expression is too long or too deeply nested.") from None
+
+    def evaluate(self, **values):
+        """
+        Computes the value of the expression.
+        :param values: Values for the variables used in the expression.
+        :raises ZeroDivisionError, ValueError, OverflowError: For invalid maths, including
+            float results that overflowed to inf or nan.
+        """
+        missing = self.variables.difference(values)
+        if missing:
+            raise ExpressionError(f"No value given for: {', '.join(sorted(missing))}.")
+        try:
+            result = self.function(values)
+        except RecursionError:
+            raise ExpressionError("The expression is too long or too deeply nested.") from None
+        if isinstance(result, float) and not math.isfinite(result):
+            raise OverflowError("result too large")
+        return result
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_expression(text):
+    """Returns the CompiledExpression for text, parsing it only if it is not in the cache."""
+    return CompiledExpression(text)
+
+
+def evaluate(text, **values):
+    """Parses (or fetches from the cache) and evaluates an expression in one call."""
+    return compile_expression(text).evaluate(**values)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate calculator expressions without opening the window.")
+    parser.add_argument("expressions", nargs="+", help='Expressions such as "2 * (3 + 4)"; each result is printed on its own line.')
+    parser.add_argument("--digits", type=int, default=DEFAULT_PRECISION,
+                        help=f"Significant digits shown (default: {DEFAULT_PRECISION}).")
+    parser.add_argument("--var", action="append", default=[], metavar="NAME=VALUE", help="Value for a variable; may be repeated.")
+    args = parser.parse_args(argv)
+
+    values = {}
+    for assignment in args.var:
+        name, _, value = assignment.partition("=")
+        try:
+            values[name.strip()] = float(value)
+        except ValueError:
+            print(f"Error: Invalid value for variable '{name.strip()}': '{value}'.", file=sys.stderr)
+            return 1
+
+    status = 0
+    for text in args.expressions:
+        try:
+            print(format_number(evaluate(text, **values), args.digits))
+        except ZeroDivisionError:
+            print(f"Error: Cannot divide by zero! ({text})", file=sys.stderr)
+            status = 1
+        except OverflowError:
+            print(f"Error: The result is too large. ({text})", file=sys.stderr)
+            status = 1
+        except ValueError as e: # Includes ExpressionError
+            print(f"Error: {e} ({text})", file=sys.stderr)
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
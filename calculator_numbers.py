@@ -0,0 +1,176 @@
+"""
+Adaptive-precision arithmetic for the calculator.
+
+Plain floats are fast but not always right: 0.1 + 0.2 gives 0.30000000000000004,
+whole numbers above 2^53 are rounded, and tiny or huge results underflow to 0 or
+overflow to inf. arithmetic() still does the sum with floats first, and only when
+a cheap check says the float answer might show wrong digits does it redo the work
+exactly:
+
+    whole numbers         int, which never loses digits
+    int / int             int if it divides evenly, otherwise Fraction
+    anything else         Decimal, rounded to the chosen number of significant digits
+
+The check: a float result is at most a few units in the last place away from the
+exact answer. If no rounding boundary at the chosen precision lies within that
+small error interval, the float result shows the right digits and is kept.
+format_number() turns any of these types into the text for the display; pass it
+the same precision as arithmetic().
+"""
+import math
+import operator
+import sys
+from decimal import Context, Decimal, Overflow
+from fractions import Fraction
+
+EPSILON = sys.float_info.epsilon # Twice the largest relative rounding error of one float operation
+MIN_NORMAL = sys.float_info.min # Below this floats lose relative precision
+FLOAT_DIGITS = 15 # Above this precision floats cannot settle the result, so the float path is skipped
+MAX_INT_DIGITS = 50 # Longer whole-number results are shown in scientific notation
+BITS_PER_DIGIT = math.log2(10)
+POWERS_OF_TEN = [10.0 ** exponent for exponent in range(-308, 309)] # POWERS_OF_TEN[308 + n] is 10.0 ** n
+
+PRECISIONS = (8, 12, 16, 28, 50) # Significant digits the user can choose from
+DEFAULT_PRECISION = 12
+
+OPERATIONS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+}
+
+DECIMAL_OPERATIONS = { # Context methods, so the result is rounded to the chosen precision
+    "+": "add",
+    "-": "subtract",
+    "*": "multiply",
+    "/": "divide",
+}
+
+NON_DIGITS = str.maketrans("", "", "+-._")
+
+
+def significant_digits(text):
+    """Counts the significant digits of a number literal, e.g. 3 for "-0.00120e5"."""
+    mantissa = text.lower().partition("e")[0]
+    return len(mantissa.translate(NON_DIGITS).strip("0"))
+
+
+def parse_number(text):
+    """
+    Converts the text of an entry field to an int (for whole numbers) or a float.
+    Numbers a float cannot hold, like 1e400 or 1e-400, are returned as a Decimal.
+    :raises ValueError: If the text is not a number, or is inf or nan.
+    """
+    text = text.strip()
+    if text.lstrip("+-").isdigit():
+        return int(text)
+    value = float(text)
+    if not MIN_NORMAL <= abs(value) < math.inf:
+        if math.isnan(value) or "inf" in text.lower():
+            raise ValueError(f"could not convert string to a finite number: '{text}'")
+        if value != 0 or significant_digits(text) != 0:
+            return Decimal(text) # Overflowed to inf, or underflowed to 0 or a less precise subnormal
+    return value
+
+
+def float_result(a, b, operator, precision):
+    """
+    Computes a op b with floats.
+    :return: The float result, or None if it might not show the right digits at precision.
+    """
+    try:
+        a = float(a)
+        b = float(b)
+    except OverflowError: # An int too big for a float
+        return None
+    result = OPERATIONS[operator](a, b)
+    if operator in ("*", "/"):
+        if result == 0 and (a == 0 or b == 0):
+            return result # Exactly 0, not an underflow
+        error = 4 * EPSILON * abs(result)
+    else:
+        error = 2 * EPSILON * (abs(a) + abs(b) + abs(result))
+    magnitude = abs(result)
+    if not MIN_NORMAL <= magnitude < math.inf:
+        return None # Underflow or overflow, or + and - cancelling to 0 (which may be inexact)
+    # Scale the result so the shown digits are its whole part; the display then rounds it at .5.
+    # Cheaper than formatting both ends of the error interval. The scaling adds a little error itself.
+    shift = precision - 1 - math.floor(math.log10(magnitude))
+    if shift > 308:
+        return None # The scale itself would overflow
+    scale = POWERS_OF_TEN[308 + shift]
+    scaled = magnitude * scale
+    if not POWERS_OF_TEN[307 + precision] <= scaled < POWERS_OF_TEN[308 + precision]:
+        return None # log10() was off by one right at a power of ten
+    if abs(scaled - math.floor(scaled) - 0.5) <= (error + 4 * EPSILON * magnitude) * scale:
+        return None # The exact answer may be on either side of a rounding boundary
+    return result
+
+
+def arithmetic(num1, num2, operator, precision=DEFAULT_PRECISION):
+    """
+    Applies operator to two numbers given as text, as exactly as needed.
+    :param num1: Text of the first number.
+    :param num2: Text of the second number.
+    :param operator: One of + - * /.
+    :param precision: Significant digits shown for results that are not whole numbers.
+    :return: An int, float, Fraction or Decimal.
+    :raises ValueError: If an input is not a number.
+    :raises ZeroDivisionError: When dividing by zero.
+    :raises OverflowError: If the result is too large even for a Decimal.
+    """
+    a = parse_number(num1)
+    b = parse_number(num2)
+    if operator == "/" and b == 0:
+        raise ZeroDivisionError("division by zero")
+    if isinstance(a, int) and isinstance(b, int):
+        if operator != "/":
+            return OPERATIONS[operator](a, b)
+        quotient, remainder = divmod(a, b)
+        return quotient if remainder == 0 else Fraction(a, b)
+
+    # Fast path: plain floats, kept if the check says they show the right digits
+    if precision <= FLOAT_DIGITS and not isinstance(a, Decimal) and not isinstance(b, Decimal):
+        result = float_result(a, b, operator, precision)
+        if result is not None:
+            return result
+
+    # Slow path: decimal arithmetic on the numbers exactly as typed
+    context = Context(prec=precision)
+    try:
+        return getattr(context, DECIMAL_OPERATIONS[operator])(Decimal(num1.strip()), Decimal(num2.strip()))
+    except Overflow:
+        raise OverflowError("result too large")
+
+
+def format_number(value, precision=DEFAULT_PRECISION):
+    """
+    Formats a result for the display with at most precision significant digits.
+    Whole numbers are shown in full up to MAX_INT_DIGITS digits; very large and very
+    small results use scientific notation instead of being cut off or shown as 0.
+    Floats show at most FLOAT_DIGITS digits, as further digits are only rounding noise.
+    """
+    if isinstance(value, int):
+        max_digits = max(precision, MAX_INT_DIGITS)
+        # Check the size first: str() refuses ints of more than 4300 digits
+        if value.bit_length() <= (max_digits + 1) * BITS_PER_DIGIT:
+            text = str(value)
+            if len(text.lstrip("-")) <= max_digits:
+                return text
+        value = Decimal(value)
+    elif isinstance(value, float):
+        if value == 0:
+            return "0" # Also for -0.0
+        return "%.*g" % (min(precision, FLOAT_DIGITS), value)
+    elif isinstance(value, Fraction):
+        value = Context(prec=precision).divide(Decimal(value.numerator), value.denominator)
+
+    # Same layout as the "g" format of floats
+    value = value.normalize(Context(prec=precision))
+    if value.is_zero():
+        return "0"
+    if -4 <= value.adjusted() < precision:
+        return format(value, "f")
+    mantissa, exponent = format(value, "e").split("e")
+    return f"{mantissa}e{int(exponent):+03d}"
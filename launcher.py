@@ -0,0 +1,133 @@
+"""
+Opens the calculator, password generator and to-do list from one small window, in one process.
+
+All three apps share a single Python interpreter, Tk interpreter and event
+loop, each in its own Toplevel window. An app's script is only loaded the
+first time it is opened, and as tkinter is already running by then, opening
+the second and third app is nearly instant. Opening an app that is already
+open brings its window to the front.
+
+    python launcher.py                     just the launcher window
+    python launcher.py calculator todo     also open these apps right away
+
+Closing the launcher closes every app the same way its own close button does,
+so the to-do list still writes its pending changes. With --metrics (see
+ui_metrics.py) the callbacks of every app opened are timed into one file.
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import tkinter as tk
+from tkinter import messagebox
+
+from ui_metrics import start_metrics
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Name on the command line -> (button text, script, module name, app class)
+APPS = {
+    "calculator": ("Calculator", "calculator.py", "calculator_app", "CalculatorApp"),
+    "password": ("Password Generator", "password generator.py", "password_app", "PasswordGeneratorApp"),
+    "todo": ("To-Do List", "to do list aditya.py", "todo_app", "TodoApp"),
+}
+
+
+def load_app_module(filename, module_name):
+    """
+    Loads an app script as a module. The scripts have spaces in their names, so they are
+    loaded by path; each one is only loaded once.
+    """
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    if HERE not in sys.path:
+        sys.path.insert(0, HERE) # The scripts import their helper modules from this folder
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(HERE, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    sys.modules[module_name] = module
+    return module
+
+
+class LauncherApp:
+    def __init__(self, master, metrics=None):
+        """
+        Initializes the launcher window.
+        :param master: The Tkinter root window; the apps open in Toplevel windows of it.
+        :param metrics: ui_metrics.Instrumentation to time the apps' callbacks with, if any.
+        """
+        self.master = master
+        self.metrics = metrics
+        master.title("Python Apps")
+        master.resizable(False, False)
+
+        self.windows = {} # Name -> (Toplevel, app) of the open apps
+
+        tk.Label(master, text="Open an app:", font=("Inter", 14)).pack(padx=20, pady=(15, 5))
+        for name, (text, *_) in APPS.items():
+            tk.Button(
+                master,
+                text=text,
+                font=("Inter", 12),
+                width=22,
+                command=lambda name=name: self.open_app(name)
+            ).pack(padx=20, pady=5)
+        tk.Label(master).pack() # Bottom margin
+
+        master.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def open_app(self, name):
+        """Opens the named app in a new Toplevel, or brings its window to the front if it is open."""
+        if name in self.windows:
+            window = self.windows[name][0]
+            window.deiconify()
+            window.lift()
+            window.focus_force()
+            return self.windows[name][1]
+
+        text, filename, module_name, class_name = APPS[name]
+        try:
+            module = load_app_module(filename, module_name)
+        except Exception as e:
+            messagebox.showerror("Launcher", f"Could not load {text}: {e}")
+            return None
+        app_class = getattr(module, class_name)
+        if self.metrics is not None:
+            self.metrics.instrument(app_class, module.CALLBACKS)
+        window = tk.Toplevel(self.master)
+        app = app_class(window)
+        self.windows[name] = (window, app)
+        # Forget the app once its window is gone, however it was closed
+        window.bind("<Destroy>", lambda event: self.windows.pop(name, None) if event.widget is window else None, add="+")
+        return app
+
+    def on_close(self):
+        """Closes every open app through its own close handler, then the launcher."""
+        for window, app in list(self.windows.values()):
+            if hasattr(app, "on_close"):
+                app.on_close()
+            else:
+                window.destroy()
+        self.master.destroy()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Open the calculator, password generator and to-do list in one process.")
+    parser.add_argument("apps", nargs="*", metavar="app", help=f"Apps to open right away: {', '.join(APPS)}.")
+    parser.add_argument("--metrics", help="Time the apps' callbacks into this JSON file, see ui_metrics.py.")
+    parser.add_argument("--profile-slow", type=float, metavar="MS", help="Also save a cProfile of calls this slow.")
+    args = parser.parse_args(argv)
+    for name in args.apps:
+        if name not in APPS:
+            parser.error(f"unknown app {name!r} (choose from {', '.join(APPS)})")
+
+    root = tk.Tk()
+    launcher = LauncherApp(root, start_metrics(root, LauncherApp, (), argv))
+    for name in args.apps:
+        launcher.open_app(name)
+    root.mainloop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,62 @@
-import tkinter as tk
-from tkinter import messagebox
-from tkinter import ttk
-import random
-import string
+import queue
+import threading
+
+from password_blocklist import BLOCKLIST_FILE, open_blocklist
+from password_core import MAX_LENGTH, character_classes, make_password, password_chunks
+from password_passphrase import MAX_WORDS, make_passphrase, open_wordlist, passphrase_chunks
+from password_strength import passphrase_bits, score_password, settings_bits, strength_label
+from ui_metrics import start_metrics
+
+# tkinter is only imported when a window is opened (see load_tkinter), so importing
+# this module for its logic stays fast and works without a display.
+tk = None
+filedialog = None
+messagebox = None
+ttk = None
+
+BATCH_CHUNK_SIZE = 5000 # Passwords handed from the worker thread to the window at a time
+BATCH_QUEUE_SIZE = 4 # Chunks that may wait in the queue before the worker pauses
+POLL_MS = 50 # How often the window checks the queue while a batch is running
+
+# Button callbacks timed when the app runs with --metrics (see ui_metrics)
+CALLBACKS = ("generate_password", "copy_to_clipboard", "generate_batch", "cancel_batch")
+
+PLACEHOLDER = "Your password will appear here"
+STRENGTH_COLORS = {
+    "Very weak": "#D32F2F",
+    "Weak": "#F57C00",
+    "Fair": "#FBC02D",
+    "Strong": "#7CB342",
+    "Very strong": "#388E3C",
+}
+BREACHED_COLOR = "#B71C1C"
+
+
+def load_tkinter():
+    """Imports tkinter into this module on first use."""
+    global tk, filedialog, messagebox, ttk
+    if tk is not None:
+        return
+    import tkinter
+    from tkinter import filedialog as tk_filedialog
+    from tkinter import messagebox as tk_messagebox
+    from tkinter import ttk as tk_ttk
+    tk, filedialog, messagebox, ttk = tkinter, tk_filedialog, tk_messagebox, tk_ttk
 
 class PasswordGeneratorApp:
-    def __init__(self, master):
+    def __init__(self, master, blocklist_path=BLOCKLIST_FILE, wordlist_path=None):
         """
         Initializes the Password Generator application.
-        :param master: The Tkinter root window.
+        :param master: The window (Tk root or Toplevel) or any other widget to build the app in.
+        :param blocklist_path: Bloom filter of breached passwords (see password_blocklist.py), used if it exists.
+        :param wordlist_path: Wordlist for passphrases; by default the first of password_passphrase.WORDLIST_FILES.
         """
+        load_tkinter()
         self.master = master
-        master.title("Password Generator")
-        master.geometry("450x550") # Increased height for better spacing
-        master.resizable(False, False) # Make the window not resizable
+        if isinstance(master, tk.Wm): # Not when placed in a frame, e.g. a tab
+            master.title("Password Generator")
+            master.geometry("450x820") # Increased height for better spacing
+            master.resizable(False, False) # Make the window not resizable
 
         # Define a modern color palette
         self.bg_color = "#ECEFF1"      # Light Blue-Gray for background
@@ -43,17 +86,31 @@ class PasswordGeneratorApp:
 
         # --- Generated Password Display (Moved to top) ---
         self.generated_password_var = tk.StringVar()
-        self.generated_password_var.set("Your password will appear here")
+        self.generated_password_var.set(PLACEHOLDER)
 
+        # Editable, so a password can be pasted in to see its strength
         self.password_display_entry = ttk.Entry(
             main_frame,
             textvariable=self.generated_password_var,
             font=("Courier", 16), # Using a monospaced font
-            justify="center",
-            state="readonly", # Make it read-only
+            justify="center"
         )
         self.password_display_entry.pack(pady=10, padx=20, fill="x", ipady=5)
 
+        # Strength meter for the password shown above
+        self.strength_bar = ttk.Progressbar(main_frame, maximum=100)
+        self.strength_bar.pack(padx=20, fill="x")
+
+        self.strength_var = tk.StringVar()
+        self.strength_label = tk.Label(
+            main_frame,
+            textvariable=self.strength_var,
+            font=("Inter", 11, "bold"),
+            bg=self.panel_bg_color,
+            fg=self.text_color
+        )
+        self.strength_label.pack(pady=(2, 10))
+
         # Copy to Clipboard Button
         copy_button = tk.Button(
             main_frame,
@@ -73,9 +130,27 @@ class PasswordGeneratorApp:
         )
         copy_button.pack(pady=(0, 20))
 
+        # --- Mode: random characters or a passphrase of words ---
+        self.mode_var = tk.StringVar(value="characters")
+        mode_frame = tk.Frame(main_frame, bg=self.panel_bg_color)
+        mode_frame.pack(padx=20, fill="x")
+
+        ttk.Radiobutton(
+            mode_frame, text="Characters", variable=self.mode_var, value="characters", style='TRadiobutton'
+        ).pack(side="left")
+
+        ttk.Radiobutton(
+            mode_frame, text="Passphrase", variable=self.mode_var, value="passphrase", style='TRadiobutton'
+        ).pack(side="left", padx=(20, 0))
+
+        # The settings of the selected mode are shown here
+        settings_area = tk.Frame(main_frame, bg=self.panel_bg_color)
+        settings_area.pack(fill="x")
+        self.character_settings = tk.Frame(settings_area, bg=self.panel_bg_color)
+        self.character_settings.pack(fill="x")
 
         # --- Settings Frame ---
-        settings_frame = tk.Frame(main_frame, bg=self.panel_bg_color)
+        settings_frame = tk.Frame(self.character_settings, bg=self.panel_bg_color)
         settings_frame.pack(pady=10, padx=20, fill="x")
 
 
@@ -90,8 +165,10 @@ class PasswordGeneratorApp:
         )
         length_label.pack(side="left", padx=(0, 10))
 
+        self.length_var = tk.StringVar()
         self.length_entry = ttk.Entry(
             settings_frame,
+            textvariable=self.length_var,
             font=("Inter", 14),
             width=5,
             justify="center"
@@ -102,7 +179,7 @@ class PasswordGeneratorApp:
 
         # Complexity Options
         options_frame = tk.LabelFrame(
-            main_frame,
+            self.character_settings,
             text="Include Characters",
             font=("Inter", 14),
             bg=self.panel_bg_color,
@@ -123,6 +200,7 @@ class PasswordGeneratorApp:
         
         s = ttk.Style()
         s.configure('TCheckbutton', background=self.panel_bg_color, foreground=self.text_color, font=checkbox_font)
+        s.configure('TRadiobutton', background=self.panel_bg_color, foreground=self.text_color, font=checkbox_font)
 
         ttk.Checkbutton(
             options_frame, text="Lowercase (a-z)", variable=self.include_lowercase, style='TCheckbutton'
@@ -140,6 +218,65 @@ class PasswordGeneratorApp:
             options_frame, text="Symbols (!@#$%)", variable=self.include_symbols, style='TCheckbutton'
         ).pack(anchor="w", pady=2)
 
+        # Passphrase options, shown instead of the above in passphrase mode
+        self.passphrase_settings = tk.LabelFrame(
+            settings_area,
+            text="Passphrase",
+            font=("Inter", 14),
+            bg=self.panel_bg_color,
+            fg=self.text_color,
+            padx=20,
+            pady=10
+        )
+
+        words_frame = tk.Frame(self.passphrase_settings, bg=self.panel_bg_color)
+        words_frame.pack(fill="x", pady=(0, 5))
+
+        tk.Label(
+            words_frame, text="Words:", font=checkbox_font, bg=self.panel_bg_color, fg=self.text_color
+        ).pack(side="left")
+
+        self.words_var = tk.StringVar(value="6")
+        ttk.Entry(
+            words_frame, textvariable=self.words_var, font=checkbox_font, width=4, justify="center"
+        ).pack(side="left", padx=(5, 20))
+
+        tk.Label(
+            words_frame, text="Separator:", font=checkbox_font, bg=self.panel_bg_color, fg=self.text_color
+        ).pack(side="left")
+
+        self.separator_var = tk.StringVar(value="-")
+        ttk.Entry(
+            words_frame, textvariable=self.separator_var, font=checkbox_font, width=4, justify="center"
+        ).pack(side="left", padx=(5, 0))
+
+        self.capitalize_words = tk.BooleanVar(value=False)
+        self.add_digit = tk.BooleanVar(value=False)
+        self.add_symbol = tk.BooleanVar(value=False)
+
+        ttk.Checkbutton(
+            self.passphrase_settings, text="Capitalize words", variable=self.capitalize_words, style='TCheckbutton'
+        ).pack(anchor="w", pady=2)
+
+        ttk.Checkbutton(
+            self.passphrase_settings, text="Add a number", variable=self.add_digit, style='TCheckbutton'
+        ).pack(anchor="w", pady=2)
+
+        ttk.Checkbutton(
+            self.passphrase_settings, text="Add a symbol", variable=self.add_symbol, style='TCheckbutton'
+        ).pack(anchor="w", pady=2)
+
+        # Strength of the passwords the current settings produce
+        self.settings_strength_var = tk.StringVar()
+        settings_strength_label = tk.Label(
+            main_frame,
+            textvariable=self.settings_strength_var,
+            font=("Inter", 11),
+            bg=self.panel_bg_color,
+            fg=self.text_color
+        )
+        settings_strength_label.pack(pady=(0, 5))
+
         # Generate Button
         generate_button = tk.Button(
             main_frame,
@@ -157,76 +294,461 @@ class PasswordGeneratorApp:
             padx=20,
             pady=10
         )
-        generate_button.pack(pady=25, fill='x', padx=20)
+        generate_button.pack(pady=(25, 10), fill='x', padx=20)
 
+        # --- Batch generation: many passwords straight to a file, on a worker thread ---
+        batch_frame = tk.Frame(main_frame, bg=self.panel_bg_color)
+        batch_frame.pack(pady=5, padx=20, fill="x")
 
-    def generate_password(self):
+        count_label = tk.Label(
+            batch_frame,
+            text="Count:",
+            font=("Inter", 12),
+            bg=self.panel_bg_color,
+            fg=self.text_color
+        )
+        count_label.pack(side="left")
+
+        self.count_entry = ttk.Entry(
+            batch_frame,
+            font=("Inter", 12),
+            width=9,
+            justify="center"
+        )
+        self.count_entry.insert(0, "10000") # Default number of passwords
+        self.count_entry.pack(side="left", padx=(5, 10))
+
+        self.cancel_button = tk.Button(
+            batch_frame,
+            text="Cancel",
+            font=("Inter", 12),
+            command=self.cancel_batch,
+            state="disabled",
+            relief="flat",
+            cursor="hand2",
+            padx=10
+        )
+        self.cancel_button.pack(side="right")
+
+        self.batch_button = tk.Button(
+            batch_frame,
+            text="Generate to File...",
+            font=("Inter", 12),
+            bg=self.copy_button_color,
+            fg="white",
+            activebackground=self.copy_button_active_color,
+            activeforeground="white",
+            command=self.generate_batch,
+            relief="flat",
+            bd=0,
+            cursor="hand2",
+            highlightthickness=0,
+            padx=10,
+            pady=5
+        )
+        self.batch_button.pack(side="right", padx=(0, 5))
+
+        self.progress_var = tk.DoubleVar(value=0)
+        self.progress_bar = ttk.Progressbar(main_frame, variable=self.progress_var, maximum=100)
+        self.progress_bar.pack(pady=(10, 0), padx=20, fill="x")
+
+        self.batch_status_var = tk.StringVar()
+        batch_status_label = tk.Label(
+            main_frame,
+            textvariable=self.batch_status_var,
+            font=("Inter", 10),
+            bg=self.panel_bg_color,
+            fg=self.text_color
+        )
+        batch_status_label.pack(pady=(2, 10))
+
+        # State of the running batch, if any
+        self.batch_thread = None
+        self.batch_queue = None
+        self.batch_cancel = None
+        self.batch_file = None
+        self.batch_path = None
+        self.batch_total = 0
+        self.batch_done = 0
+        self.batch_job = None # after() id of the next poll_batch()
+
+        if isinstance(master, tk.Wm):
+            master.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Breached passwords are never generated and are flagged when pasted
+        self.blocklist = None
+        try:
+            self.blocklist = open_blocklist(blocklist_path)
+        except (OSError, ValueError) as e:
+            messagebox.showwarning("Blocklist Error", f"Could not open the breached password list: {e}")
+
+        # The wordlist is opened the first time passphrase mode is used
+        self.wordlist = None
+        self.wordlist_path = wordlist_path
+        self.generated_bits = None # (passphrase, bits) for the last generated passphrase
+
+        # Update the strength displays on every change to the password or settings
+        self.generated_password_var.trace_add("write", self.update_password_strength)
+        for variable in (self.length_var, self.include_lowercase, self.include_uppercase,
+                         self.include_digits, self.include_symbols, self.words_var, self.add_digit, self.add_symbol):
+            variable.trace_add("write", self.update_settings_strength)
+        self.mode_var.trace_add("write", self.switch_mode)
+        self.update_settings_strength()
+        self.update_password_strength()
+
+
+    def read_settings(self):
         """
-        Generates a password based on user-specified length and complexity.
+        Reads the length and character type settings, warning about (and fixing) bad values.
+        :return: (length, classes), or None if no password can be generated.
+        :raises ValueError: If the length is not a number.
         """
-        try:
-            length = int(self.length_entry.get())
-            if length <= 0:
-                messagebox.showwarning("Invalid Length", "Password length must be a positive number.")
-                return
-            if length > 128: # Prevent excessively long passwords
-                messagebox.showwarning("Length Warning", "Password length capped at 128 for practicality.")
-                length = 128
-                self.length_entry.delete(0, tk.END)
-                self.length_entry.insert(0, "128")
-
-
-            character_pool = ""
-            required_characters = [] # To ensure at least one of each selected type
-
-            if self.include_lowercase.get():
-                character_pool += string.ascii_lowercase
-                required_characters.append(random.choice(string.ascii_lowercase))
-            if self.include_uppercase.get():
-                character_pool += string.ascii_uppercase
-                required_characters.append(random.choice(string.ascii_uppercase))
-            if self.include_digits.get():
-                character_pool += string.digits
-                required_characters.append(random.choice(string.digits))
-            if self.include_symbols.get():
-                character_pool += string.punctuation
-                required_characters.append(random.choice(string.punctuation))
-
-            if not character_pool:
-                messagebox.showwarning("Selection Error", "Please select at least one character type.")
-                self.generated_password_var.set("No character types selected!")
-                return
+        length = int(self.length_entry.get())
+        if length <= 0:
+            messagebox.showwarning("Invalid Length", "Password length must be a positive number.")
+            return None
+        if length > MAX_LENGTH: # Prevent excessively long passwords
+            messagebox.showwarning("Length Warning", f"Password length capped at {MAX_LENGTH} for practicality.")
+            length = MAX_LENGTH
+            self.length_entry.delete(0, tk.END)
+            self.length_entry.insert(0, str(MAX_LENGTH))
+
+
+        classes = character_classes(
+            self.include_lowercase.get(),
+            self.include_uppercase.get(),
+            self.include_digits.get(),
+            self.include_symbols.get()
+        )
 
-            # Ensure length is not less than the number of required character types
-            if length < len(required_characters):
-                length = len(required_characters)
-                self.length_entry.delete(0, tk.END)
-                self.length_entry.insert(0, str(length))
-                messagebox.showwarning("Length Conflict", f"Length adjusted to {length} to include all selected character types.")
+        if not classes:
+            messagebox.showwarning("Selection Error", "Please select at least one character type.")
+            self.generated_password_var.set("No character types selected!")
+            return None
+
+        # Ensure length is not less than the number of required character types
+        if length < len(classes):
+            length = len(classes)
+            self.length_entry.delete(0, tk.END)
+            self.length_entry.insert(0, str(length))
+            messagebox.showwarning("Length Conflict", f"Length adjusted to {length} to include all selected character types.")
+
+        return length, classes
+
+    def switch_mode(self, *args):
+        """Shows the settings of the selected mode, opening the wordlist when passphrases are selected."""
+        if self.mode_var.get() == "passphrase":
+            self.load_wordlist()
+            self.character_settings.pack_forget()
+            self.passphrase_settings.pack(pady=(20, 10), fill="x", padx=20)
+        else:
+            self.passphrase_settings.pack_forget()
+            self.character_settings.pack(fill="x")
+        self.update_settings_strength()
+
+    def load_wordlist(self):
+        """Opens the wordlist on first use; returns it, or None after a warning."""
+        if self.wordlist is None:
+            try:
+                self.wordlist = open_wordlist(self.wordlist_path)
+            except (OSError, ValueError) as e:
+                messagebox.showwarning("Wordlist Error", f"Could not open the wordlist: {e}")
+                return None
+            if self.wordlist is None:
+                messagebox.showwarning("Wordlist Error", "No wordlist found. Please save one word per line as wordlist.txt.")
+        return self.wordlist
+
+    def update_settings_strength(self, *args):
+        """Shows the entropy of passwords (or passphrases) made with the current settings."""
+        if self.mode_var.get() == "passphrase":
+            self.update_passphrase_strength()
+            return
+        try:
+            length = int(self.length_var.get())
+        except ValueError:
+            self.settings_strength_var.set("")
+            return
+        classes = character_classes(
+            self.include_lowercase.get(),
+            self.include_uppercase.get(),
+            self.include_digits.get(),
+            self.include_symbols.get()
+        )
+        if not classes:
+            self.settings_strength_var.set("Select at least one character type.")
+            return
+        # The same adjustments read_settings() makes before generating
+        length = min(max(length, len(classes)), MAX_LENGTH)
+        bits = settings_bits(length, tuple(classes))
+        self.settings_strength_var.set(f"New passwords: about {bits:.0f} bits of entropy")
+
+    def update_passphrase_strength(self):
+        """Shows the entropy of passphrases: wordlist size times number of words, plus any added characters."""
+        try:
+            words = min(max(int(self.words_var.get()), 1), MAX_WORDS)
+        except ValueError:
+            self.settings_strength_var.set("")
+            return
+        if self.wordlist is None:
+            self.settings_strength_var.set("No wordlist loaded.")
+            return
+        bits = passphrase_bits(len(self.wordlist), words, self.add_digit.get(), self.add_symbol.get())
+        self.settings_strength_var.set(f"New passphrases: about {bits:.0f} bits ({words} of {len(self.wordlist):,} words)")
+
+    def update_password_strength(self, *args):
+        """Scores the password in the display, whether generated or pasted in."""
+        password = self.generated_password_var.get()
+        if not self.is_password(password):
+            self.strength_bar.config(value=0)
+            self.strength_var.set("")
+            return
+        if self.blocklist is not None and password in self.blocklist:
+            self.strength_bar.config(value=0)
+            self.strength_var.set("Found in a list of breached passwords!")
+            self.strength_label.config(fg=BREACHED_COLOR)
+            return
+        if self.generated_bits is not None and self.generated_bits[0] == password:
+            # A generated passphrase is as strong as the number of possible passphrases
+            bits = self.generated_bits[1]
+            label = strength_label(bits)
+        else:
+            bits, label = score_password(password)
+        self.strength_bar.config(value=min(bits, 100))
+        self.strength_var.set(f"Strength: {label} ({bits:.0f} bits)")
+        self.strength_label.config(fg=STRENGTH_COLORS[label])
 
+    def is_password(self, text):
+        """Tells a password in the display apart from the placeholder and error messages."""
+        return bool(text) and text not in (PLACEHOLDER, "No character types selected!") and not text.startswith("Error")
 
-            # Generate the rest of the password
-            remaining_length = length - len(required_characters)
-            
-            password_list = required_characters + [random.choice(character_pool) for _ in range(remaining_length)]
-            random.shuffle(password_list) # Shuffle to randomize positions
+    def read_passphrase_settings(self):
+        """
+        Reads the passphrase settings, warning about (and fixing) a bad number of words.
+        :return: Keyword arguments for make_passphrase(), or None if no wordlist could be opened.
+        :raises ValueError: If the number of words is not a number.
+        """
+        words = int(self.words_var.get())
+        if self.load_wordlist() is None:
+            return None
+        if not 1 <= words <= MAX_WORDS:
+            words = min(max(words, 1), MAX_WORDS)
+            self.words_var.set(str(words))
+            messagebox.showwarning("Word Count", f"Number of words adjusted to {words} (1 to {MAX_WORDS}).")
+        return {
+            "words": words,
+            "separator": self.separator_var.get(),
+            "capitalize": self.capitalize_words.get(),
+            "add_digit": self.add_digit.get(),
+            "add_symbol": self.add_symbol.get()
+        }
+
+    def generate_passphrase(self):
+        """
+        Generates a passphrase from the wordlist with the passphrase settings.
+        """
+        try:
+            options = self.read_passphrase_settings()
+        except ValueError:
+            messagebox.showerror("Input Error", "Please enter a valid number of words.")
+            self.generated_password_var.set("Error: Invalid number of words")
+            return
+        if options is None:
+            return
 
-            generated_password = "".join(password_list)
-            self.generated_password_var.set(generated_password)
+        try:
+            passphrase = make_passphrase(self.wordlist, blocklist=self.blocklist, **options)
+        except ValueError as e:
+            messagebox.showerror("Blocklist Error", str(e))
+            self.generated_password_var.set("Error: Only breached passphrases found")
+            return
+        bits = passphrase_bits(len(self.wordlist), options["words"], options["add_digit"], options["add_symbol"])
+        self.generated_bits = (passphrase, bits)
+        self.generated_password_var.set(passphrase)
 
+    def generate_password(self):
+        """
+        Generates a password based on user-specified length and complexity,
+        or a passphrase in passphrase mode.
+        """
+        if self.mode_var.get() == "passphrase":
+            self.generate_passphrase()
+            return
+        try:
+            settings = self.read_settings()
         except ValueError:
             messagebox.showerror("Input Error", "Please enter a valid number for password length.")
             self.generated_password_var.set("Error: Invalid length")
+            return
+        if settings is None:
+            return
+
+        try:
+            # At least one character of each selected type, the rest from all of them,
+            # with candidates in the blocklist skipped
+            generated_password = make_password(*settings, blocklist=self.blocklist)
+            self.generated_password_var.set(generated_password)
+
+        except ValueError as e:
+            messagebox.showerror("Blocklist Error", str(e))
+            self.generated_password_var.set("Error: Only breached passwords found")
         except Exception as e:
             messagebox.showerror("Error", f"An unexpected error occurred: {e}")
             self.generated_password_var.set("Error generating password")
 
+    def generate_batch(self):
+        """
+        Generates the number of passwords (or passphrases, in passphrase mode) in the count field into a file, one per line.
+        The work runs on a worker thread; poll_batch() picks up the results, so the window stays usable.
+        """
+        if self.batch_thread is not None:
+            return
+        passphrases = self.mode_var.get() == "passphrase"
+        try:
+            count = int(self.count_entry.get())
+            settings = self.read_passphrase_settings() if passphrases else self.read_settings()
+        except ValueError:
+            setting = "number of words" if passphrases else "password length"
+            messagebox.showerror("Input Error", f"Please enter valid numbers for {setting} and count.")
+            return
+        if settings is None:
+            return
+        if count <= 0:
+            messagebox.showwarning("Invalid Count", "The number of passwords must be a positive number.")
+            return
+
+        path = filedialog.asksaveasfilename(
+            title="Save Passwords",
+            defaultextension=".txt",
+            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            self.batch_file = open(path, "w", encoding="utf-8")
+        except OSError as e:
+            messagebox.showerror("Save Error", f"Could not create the file: {e}")
+            return
+
+        if passphrases:
+            chunks = passphrase_chunks(count, self.wordlist, BATCH_CHUNK_SIZE, blocklist=self.blocklist, **settings)
+        else:
+            length, classes = settings
+            chunks = password_chunks(count, length, classes, chunk_size=BATCH_CHUNK_SIZE, blocklist=self.blocklist)
+        self.batch_path = path
+        self.batch_total = count
+        self.batch_done = 0
+        self.batch_queue = queue.Queue(maxsize=BATCH_QUEUE_SIZE)
+        self.batch_cancel = threading.Event()
+        self.batch_thread = threading.Thread(
+            target=self.run_batch,
+            args=(chunks, self.batch_queue, self.batch_cancel),
+            daemon=True
+        )
+        self.batch_button.config(state="disabled")
+        self.cancel_button.config(state="normal")
+        self.progress_var.set(0)
+        self.batch_status_var.set(f"Generating {count:,} passwords...")
+        self.batch_thread.start()
+        self.batch_job = self.master.after(POLL_MS, self.poll_batch)
+
+    def run_batch(self, chunks, results, cancel):
+        """
+        Runs on the worker thread: puts ("chunk", passwords) messages on the results queue,
+        then ("error", exception) or ("done", None). Never touches Tk.
+        The last message is dropped if the batch was cancelled and the queue is full, as
+        nobody may be reading it after on_close(); poll_batch() notices the thread has ended.
+        :param chunks: Iterator of lists of passwords, e.g. from password_chunks(); consumed here.
+        """
+        try:
+            for chunk in chunks:
+                while not cancel.is_set():
+                    try:
+                        results.put(("chunk", chunk), timeout=0.1) # Waits while the window catches up
+                        break
+                    except queue.Full:
+                        pass
+                if cancel.is_set():
+                    break
+        except Exception as e:
+            message = ("error", e)
+        else:
+            message = ("done", None)
+        while True:
+            try:
+                results.put(message, timeout=0.1)
+                return
+            except queue.Full:
+                if cancel.is_set():
+                    return
+
+    def poll_batch(self):
+        """Runs on the Tk thread every POLL_MS while a batch is running: saves new results and shows progress."""
+        try:
+            while True:
+                kind, payload = self.batch_queue.get_nowait()
+                if kind == "chunk":
+                    if not self.batch_cancel.is_set():
+                        self.batch_file.write("\n".join(payload))
+                        self.batch_file.write("\n")
+                        self.batch_done += len(payload)
+                elif kind == "error":
+                    self.finish_batch(f"Stopped by an error after {self.batch_done:,} passwords.")
+                    messagebox.showerror("Error", f"An unexpected error occurred: {payload}")
+                    return
+                else:
+                    if self.batch_cancel.is_set():
+                        self.finish_batch(f"Cancelled; {self.batch_done:,} passwords saved.")
+                    else:
+                        self.finish_batch(f"Saved {self.batch_done:,} passwords to {self.batch_path}.")
+                    return
+        except queue.Empty:
+            if self.batch_cancel.is_set() and not self.batch_thread.is_alive():
+                self.finish_batch(f"Cancelled; {self.batch_done:,} passwords saved.") # Its last message was dropped
+                return
+        except OSError as e:
+            self.batch_cancel.set()
+            self.finish_batch(f"Stopped after {self.batch_done:,} passwords.")
+            messagebox.showerror("Save Error", f"Could not write the file: {e}")
+            return
+        if not self.batch_cancel.is_set():
+            self.progress_var.set(self.batch_done * 100 / self.batch_total)
+            self.batch_status_var.set(f"Saved {self.batch_done:,} of {self.batch_total:,} passwords...")
+        self.batch_job = self.master.after(POLL_MS, self.poll_batch)
+
+    def cancel_batch(self):
+        """Asks the worker thread to stop; poll_batch() finishes up once it has."""
+        if self.batch_cancel is not None:
+            self.batch_cancel.set()
+            self.cancel_button.config(state="disabled")
+            self.batch_status_var.set("Cancelling...")
+
+    def finish_batch(self, message):
+        """Closes the output file and resets the batch controls."""
+        try:
+            self.batch_file.close()
+        except OSError:
+            pass
+        self.batch_thread = None
+        self.batch_file = None
+        self.batch_button.config(state="normal")
+        self.cancel_button.config(state="disabled")
+        self.progress_var.set(self.batch_done * 100 / self.batch_total)
+        self.batch_status_var.set(message)
+
+    def on_close(self):
+        """Stops a running batch, keeping what was saved so far, then closes the window."""
+        if self.batch_thread is not None:
+            self.batch_cancel.set()
+            self.batch_file.close()
+            self.master.after_cancel(self.batch_job)
+        self.master.destroy()
+
     def copy_to_clipboard(self):
         """
         Copies the generated password to the clipboard.
         """
         password = self.generated_password_var.get()
-        if password and password != "Your password will appear here" and not password.startswith("Error"):
+        if self.is_password(password):
             self.master.clipboard_clear()
             self.master.clipboard_append(password)
             messagebox.showinfo("Copied!", "Password copied to clipboard.")
@@ -235,6 +757,7 @@ class PasswordGeneratorApp:
 
 # Main part of the script to run the application
 if __name__ == "__main__":
+    load_tkinter()
     root = tk.Tk()
     # Add font check if possible, otherwise rely on system fonts
     try:
@@ -245,5 +768,6 @@ if __name__ == "__main__":
     except tk.TclError:
         print("Inter font not found, using default system font.")
 
+    start_metrics(root, PasswordGeneratorApp, CALLBACKS)
     app = PasswordGeneratorApp(root)
     root.mainloop()
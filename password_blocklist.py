@@ -0,0 +1,173 @@
+"""
+Offline check of passwords against leaked-password lists, using a Bloom filter file.
+
+A leaked-password list with hundreds of millions of lines is turned once into a
+compact filter file (about 14 bits per password at the default error rate):
+
+    python password_blocklist.py build rockyou.txt breached.bloom
+    python password_blocklist.py check breached.bloom "password123" "x7#Kq!2m"
+
+The Password Generator opens the filter with BloomFilter(path), which only reads
+the header and memory-maps the rest, so it is ready instantly whatever the size.
+Checking a password hashes it once and looks at `hashes` bits, O(k). A Bloom
+filter never misses a listed password; about one unlisted password in 1/error_rate
+is reported as listed too, which only costs the generator one more candidate.
+
+The build streams its input line by line and sets bits directly in the
+memory-mapped output file, so neither the list nor the filter has to fit in RAM.
+"""
+import argparse
+import hashlib
+import math
+import mmap
+import os
+import struct
+import sys
+
+BLOCKLIST_FILE = "breached.bloom" # Filter the Password Generator uses when it exists
+MAGIC = b"PWBLOOM1"
+HEADER = struct.Struct("<8sQIQ") # Magic, number of bits, number of hashes, number of passwords
+ERROR_RATE = 0.001 # Default share of unlisted passwords reported as listed
+READ_SIZE = 1 << 20 # Bytes read at a time when counting input lines
+
+
+def filter_size(count, error_rate=ERROR_RATE):
+    """Returns (bits, hashes), the optimal filter size for count passwords at this error rate."""
+    count = max(count, 1)
+    bits = max(64, math.ceil(-count * math.log(error_rate) / math.log(2) ** 2))
+    hashes = max(1, round(bits / count * math.log(2)))
+    return bits, hashes
+
+
+def bit_positions(data, bits, hashes):
+    """Yields the filter bits for a password given as bytes (double hashing of one BLAKE2b digest)."""
+    digest = hashlib.blake2b(data, digest_size=16).digest()
+    first = int.from_bytes(digest[:8], "little")
+    step = int.from_bytes(digest[8:], "little") | 1
+    for i in range(hashes):
+        yield (first + i * step) % bits
+
+
+class BloomFilter:
+    """A read-only, memory-mapped Bloom filter file made by build_filter(). Use `password in filter`."""
+
+    def __init__(self, path):
+        """
+        :raises OSError: If the file cannot be opened.
+        :raises ValueError: If it is not a filter file made by build_filter().
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ValueError(f"{path} is not a password blocklist file.")
+            magic, self.bits, self.hashes, self.count = HEADER.unpack(header)
+            if magic != MAGIC or os.fstat(f.fileno()).st_size < HEADER.size + (self.bits + 7) // 8:
+                raise ValueError(f"{path} is not a password blocklist file.")
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __contains__(self, password):
+        data = password.encode("utf-8") if isinstance(password, str) else password
+        view = self.map
+        for position in bit_positions(data, self.bits, self.hashes):
+            if not view[HEADER.size + (position >> 3)] >> (position & 7) & 1:
+                return False
+        return True
+
+    def __len__(self):
+        return self.count
+
+    def __getstate__(self):
+        return self.path # Worker processes open the file themselves
+
+    def __setstate__(self, path):
+        self.__init__(path)
+
+    def close(self):
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_blocklist(path=BLOCKLIST_FILE):
+    """Returns the BloomFilter at path, or None if there is no such file."""
+    if not os.path.exists(path):
+        return None
+    return BloomFilter(path)
+
+
+def count_lines(path):
+    """Counts the lines of a file without decoding it."""
+    count = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        while block := f.read(READ_SIZE):
+            count += block.count(b"\n")
+            last = block[-1:]
+    return count + (last != b"\n")
+
+
+def build_filter(lines, path, count, error_rate=ERROR_RATE):
+    """
+    Writes a filter file for the passwords in an iterable of byte lines, e.g. an open binary file.
+    :param count: Number of passwords, or an estimate; more than this raises the error rate.
+    :return: Number of passwords added (empty lines are skipped).
+    """
+    bits, hashes = filter_size(count, error_rate)
+    added = 0
+    with open(path, "w+b") as f:
+        f.truncate(HEADER.size + (bits + 7) // 8)
+        with mmap.mmap(f.fileno(), 0) as view:
+            for line in lines:
+                line = line.rstrip(b"\r\n")
+                if not line:
+                    continue
+                for position in bit_positions(line, bits, hashes):
+                    view[HEADER.size + (position >> 3)] |= 1 << (position & 7)
+                added += 1
+            view[:HEADER.size] = HEADER.pack(MAGIC, bits, hashes, added)
+    return added
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query a breached-password blocklist.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="Make a filter file from a password list, one password per line.")
+    build_parser.add_argument("passwords", help="The password list, or - for standard input (needs --count).")
+    build_parser.add_argument("output", nargs="?", default=BLOCKLIST_FILE, help=f"Filter file to write (default: {BLOCKLIST_FILE}).")
+    build_parser.add_argument("--count", type=int, help="Number of passwords in the list (default: count the lines first).")
+    build_parser.add_argument("--error-rate", type=float, default=ERROR_RATE, help=f"Share of false hits (default: {ERROR_RATE}).")
+    check_parser = commands.add_parser("check", help="Tell whether passwords are in a filter file.")
+    check_parser.add_argument("filter", help="The filter file.")
+    check_parser.add_argument("password", nargs="+")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "build":
+            if not 0 < args.error_rate < 1:
+                raise ValueError("The error rate must be between 0 and 1.")
+            if args.passwords == "-":
+                if args.count is None:
+                    raise ValueError("Reading from standard input needs --count.")
+                added = build_filter(sys.stdin.buffer, args.output, args.count, args.error_rate)
+            else:
+                count = args.count if args.count is not None else count_lines(args.passwords)
+                with open(args.passwords, "rb") as f:
+                    added = build_filter(f, args.output, count, args.error_rate)
+            print(f"Added {added:,} passwords to {args.output} ({os.path.getsize(args.output):,} bytes).")
+        else:
+            with BloomFilter(args.filter) as blocklist:
+                for password in args.password:
+                    print(f"{'listed' if password in blocklist else 'not listed'}: {password}")
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
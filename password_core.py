@@ -0,0 +1,202 @@
+"""
+Password generation without any GUI.
+
+The Password Generator window uses these functions, and they can be imported by
+scripts or run from the command line without starting Tk:
+
+    python password_core.py --length 16 --count 5 --no-symbols
+    python password_core.py --count 1000000 --output passwords.txt --processes 4
+    python password_core.py --count 5 --blocklist breached.bloom
+
+Randomness comes from os.urandom (the same source as the secrets module), read
+in large blocks. Each block is turned into characters of the pool in one
+bytes.translate() call: a byte b below the largest multiple of the pool size
+becomes pool[b % len(pool)], larger bytes are dropped (rejection sampling), so
+every character is equally likely. A password that misses one of the selected
+character types is thrown away and the next one is taken, which keeps the
+"at least one of each type" guarantee with every valid password equally likely.
+A password found in an optional blocklist (see password_blocklist.py) is thrown
+away in the same way.
+"""
+import argparse
+import os
+import string
+import sys
+from functools import lru_cache
+
+MAX_LENGTH = 128 # Longer passwords are capped for practicality in the window
+
+LOWERCASE = string.ascii_lowercase
+UPPERCASE = string.ascii_uppercase
+DIGITS = string.digits
+SYMBOLS = string.punctuation
+
+BLOCK_SIZE = 65536 # Random bytes read from the OS at a time
+CHUNK_SIZE = 10000 # Passwords per chunk when streaming or sharing work between processes
+MAX_BLOCKED = 1000 # Blocklisted candidates in a row before giving up
+
+
+def character_classes(lowercase=True, uppercase=True, digits=True, symbols=True):
+    """Returns the list of character sets for the selected character types."""
+    classes = []
+    if lowercase:
+        classes.append(LOWERCASE)
+    if uppercase:
+        classes.append(UPPERCASE)
+    if digits:
+        classes.append(DIGITS)
+    if symbols:
+        classes.append(SYMBOLS)
+    return classes
+
+
+@lru_cache(maxsize=32)
+def translation_table(pool):
+    """
+    Returns (table, rejected) for bytes.translate(): bytes below the largest multiple of
+    len(pool) map evenly onto the pool, the rejected bytes above it are deleted.
+    """
+    limit = 256 - 256 % len(pool)
+    table = bytes(ord(pool[b % len(pool)]) for b in range(limit)) + bytes(256 - limit)
+    return table, bytes(range(limit, 256))
+
+
+class PasswordGenerator:
+    """Generates passwords of one length and set of character types from blocks of OS randomness."""
+
+    def __init__(self, length, classes, block_size=BLOCK_SIZE, blocklist=None):
+        """
+        :param length: Number of characters; at least len(classes).
+        :param classes: Character sets, see character_classes(). Characters must be in the
+            range chr(0) to chr(255) so they can be produced by bytes.translate().
+        :param block_size: Random bytes read at a time.
+        :param blocklist: Passwords never to return, e.g. a password_blocklist.BloomFilter.
+        :raises ValueError: If no class is given or length is too short to include them all.
+        """
+        if not classes:
+            raise ValueError("Please select at least one character type.")
+        if length < len(classes):
+            raise ValueError(f"Length must be at least {len(classes)} to include all selected character types.")
+        pool = "".join(dict.fromkeys("".join(classes))) # Each character once, even if classes overlap
+        if max(map(ord, pool)) > 255:
+            raise ValueError("Only characters up to chr(255) are supported.")
+        self.length = length
+        self.classes = [frozenset(characters) for characters in classes]
+        self.block_size = block_size
+        self.blocklist = blocklist
+        self.table, self.rejected = translation_table(pool)
+        self.characters = "" # Random pool characters not used yet
+        self.position = 0
+
+    def fill(self):
+        """Appends the characters made from a new block of random bytes."""
+        block = os.urandom(self.block_size).translate(self.table, self.rejected)
+        self.characters = self.characters[self.position:] + block.decode("latin-1")
+        self.position = 0
+
+    def password(self):
+        """
+        Returns one password containing at least one character of each class and not in the blocklist.
+        :raises ValueError: If MAX_BLOCKED candidates in a row are all in the blocklist.
+        """
+        length = self.length
+        blocked = 0
+        while True:
+            if self.position + length > len(self.characters):
+                self.fill()
+                continue
+            candidate = self.characters[self.position:self.position + length]
+            self.position += length
+            for characters in self.classes:
+                if characters.isdisjoint(candidate):
+                    break # A type is missing, so take the next candidate instead
+            else:
+                if self.blocklist is None or candidate not in self.blocklist:
+                    return candidate
+                blocked += 1
+                if blocked >= MAX_BLOCKED:
+                    raise ValueError("Nearly every password with these settings is in the blocklist. "
+                                     "Please choose a longer password or more character types.")
+
+    def passwords(self, count):
+        """Returns a list of count passwords."""
+        password = self.password
+        return [password() for _ in range(count)]
+
+
+def make_password(length, classes, blocklist=None):
+    """
+    Generates a single password containing at least one character of each class and not in the blocklist.
+    :raises ValueError: If no class is given, length is too short to include them all,
+        or the blocklist rejects nearly every candidate.
+    """
+    return PasswordGenerator(length, classes, block_size=max(64, 4 * length), blocklist=blocklist).password()
+
+
+def generate_chunk(count, length, classes, blocklist=None):
+    """Worker for the process pool: returns count passwords."""
+    return PasswordGenerator(length, classes, blocklist=blocklist).passwords(count)
+
+
+def password_chunks(count, length, classes, processes=1, chunk_size=CHUNK_SIZE, blocklist=None):
+    """
+    Yields lists of passwords, chunk_size at a time, count in total.
+    :param processes: With more than 1, chunks are generated by a pool of that many processes.
+        Each process reads its own randomness from the OS; chunks are yielded in order.
+    :raises ValueError: As PasswordGenerator, when iteration starts.
+    """
+    generator = PasswordGenerator(length, classes, blocklist=blocklist)
+    sizes = [min(chunk_size, count - start) for start in range(0, count, chunk_size)]
+    if processes <= 1 or len(sizes) <= 1:
+        for size in sizes:
+            yield generator.passwords(size)
+        return
+    from concurrent.futures import ProcessPoolExecutor # Imported here as it pulls in multiprocessing
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        yield from pool.map(generate_chunk, sizes, [length] * len(sizes), [classes] * len(sizes),
+                            [blocklist] * len(sizes))
+
+
+def write_passwords(f, count, length, classes, processes=1, blocklist=None):
+    """Writes count passwords to an open text file, one per line, without keeping them all in memory."""
+    for chunk in password_chunks(count, length, classes, processes, blocklist=blocklist):
+        f.write("\n".join(chunk))
+        f.write("\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate random passwords.")
+    parser.add_argument("--length", type=int, default=12, help="Password length (default: 12).")
+    parser.add_argument("--count", type=int, default=1, help="Number of passwords to write (default: 1).")
+    parser.add_argument("--output", default="-", help="File to write, one password per line (default: standard output).")
+    parser.add_argument("--processes", type=int, default=1, help="Generate in this many processes (default: 1).")
+    parser.add_argument("--blocklist", help="Skip passwords in this filter file, made by password_blocklist.py.")
+    parser.add_argument("--no-lowercase", action="store_true", help="Leave out lowercase letters.")
+    parser.add_argument("--no-uppercase", action="store_true", help="Leave out uppercase letters.")
+    parser.add_argument("--no-digits", action="store_true", help="Leave out numbers.")
+    parser.add_argument("--no-symbols", action="store_true", help="Leave out symbols.")
+    args = parser.parse_args(argv)
+
+    if args.length <= 0 or args.count < 0:
+        print("Error: Password length and count must be positive numbers.", file=sys.stderr)
+        return 1
+    classes = character_classes(not args.no_lowercase, not args.no_uppercase, not args.no_digits, not args.no_symbols)
+    try:
+        blocklist = None
+        if args.blocklist:
+            from password_blocklist import BloomFilter # Only needed with --blocklist
+            blocklist = BloomFilter(args.blocklist)
+        PasswordGenerator(args.length, classes) # Check the settings before creating the output file
+        if args.output == "-":
+            write_passwords(sys.stdout, args.count, args.length, classes, args.processes, blocklist)
+        else:
+            with open(args.output, "w", encoding="utf-8") as f:
+                write_passwords(f, args.count, args.length, classes, args.processes, blocklist)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Diceware-style passphrases drawn from a wordlist file.
+
+Any list with one word per line works, including the numbered diceware lists
+("11111<TAB>abacus"; the last field of each line is taken as the word):
+
+    python password_passphrase.py --wordlist eff_large_wordlist.txt --words 6 --count 5
+
+The first time a wordlist is used, an offset index is written next to it
+(<wordlist>.idx): one fixed-size (offset, length) entry per distinct word. From
+then on Wordlist() memory-maps the list and the index without parsing either,
+so opening is instant, and word i is read straight from its offset, O(1).
+The index is rebuilt automatically when the wordlist file changes. Words are
+picked with the secrets module.
+"""
+import argparse
+import mmap
+import os
+import secrets
+import string
+import struct
+import sys
+
+from password_core import MAX_BLOCKED
+
+WORDLIST_FILES = ("wordlist.txt", "/usr/share/dict/words") # Tried in this order when none is given
+MAGIC = b"PWWORDS1"
+HEADER = struct.Struct("<8sQQQ") # Magic, number of words, wordlist size and modification time
+ENTRY = struct.Struct("<QI") # Offset and length of one word in the wordlist
+MAX_WORDS = 20 # More words are capped for practicality in the window
+DIGITS = string.digits
+SYMBOLS = string.punctuation
+
+
+def build_index(path):
+    """
+    Reads a wordlist once and returns its index: HEADER, then an ENTRY per distinct word.
+    :raises ValueError: If the file has no words.
+    """
+    stat = os.stat(path)
+    entries = bytearray()
+    seen = set()
+    offset = 0
+    with open(path, "rb") as f:
+        for line in f:
+            fields = line.split()
+            if fields and not fields[0].startswith(b"#") and fields[-1] not in seen:
+                word = fields[-1]
+                seen.add(word)
+                entries += ENTRY.pack(offset + len(line.rstrip()) - len(word), len(word))
+            offset += len(line)
+    if not seen:
+        raise ValueError(f"{path} contains no words.")
+    return HEADER.pack(MAGIC, len(seen), stat.st_size, stat.st_mtime_ns) + entries
+
+
+class Wordlist:
+    """A memory-mapped wordlist with its offset index. wordlist[i] is the i-th distinct word."""
+
+    def __init__(self, path):
+        """
+        Opens the wordlist, building and saving its index first if there is none or it is out of date.
+        :raises OSError: If the wordlist cannot be opened.
+        :raises ValueError: If it has no words.
+        """
+        self.path = path
+        self.index_path = path + ".idx"
+        stat = os.stat(path)
+        self.index = self.open_index(stat)
+        if self.index is None:
+            self.index = build_index(path)
+            try:
+                temporary = self.index_path + ".tmp"
+                with open(temporary, "wb") as f:
+                    f.write(self.index)
+                os.replace(temporary, self.index_path)
+            except OSError:
+                pass # The wordlist's folder is read-only; keep using the index in memory
+        self.count = HEADER.unpack_from(self.index)[1]
+        with open(path, "rb") as f:
+            self.words = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def open_index(self, stat):
+        """Returns the memory-mapped index if it exists and matches the wordlist, else None."""
+        try:
+            with open(self.index_path, "rb") as f:
+                index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        magic, count, size, mtime = HEADER.unpack_from(index) if len(index) >= HEADER.size else (None, 0, 0, 0)
+        if (magic, size, mtime) != (MAGIC, stat.st_size, stat.st_mtime_ns) or len(index) != HEADER.size + count * ENTRY.size:
+            index.close()
+            return None
+        return index
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError("word index out of range")
+        offset, length = ENTRY.unpack_from(self.index, HEADER.size + i * ENTRY.size)
+        return self.words[offset:offset + length].decode("utf-8", errors="replace")
+
+    def random_word(self):
+        """Returns a uniformly chosen word."""
+        return self[secrets.randbelow(self.count)]
+
+    def close(self):
+        self.words.close()
+        if isinstance(self.index, mmap.mmap):
+            self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_wordlist(path=None):
+    """Opens the given wordlist, or the first of WORDLIST_FILES that exists; None if there is none."""
+    if path is not None:
+        return Wordlist(path)
+    for candidate in WORDLIST_FILES:
+        if os.path.exists(candidate):
+            return Wordlist(candidate)
+    return None
+
+
+def make_passphrase(wordlist, words=6, separator="-", capitalize=False, add_digit=False, add_symbol=False,
+                    blocklist=None):
+    """
+    Generates a passphrase of randomly chosen words.
+    :param add_digit: Append a random digit to one randomly chosen word.
+    :param add_symbol: Append a random symbol to one randomly chosen word.
+    :param blocklist: Passphrases never to return, e.g. a password_blocklist.BloomFilter.
+    :raises ValueError: If words is out of range, or the blocklist rejects nearly every candidate.
+    """
+    if not 1 <= words <= MAX_WORDS:
+        raise ValueError(f"The number of words must be between 1 and {MAX_WORDS}.")
+    for _ in range(MAX_BLOCKED):
+        chosen = [wordlist.random_word() for _ in range(words)]
+        if capitalize:
+            chosen = [word.capitalize() for word in chosen]
+        if add_digit:
+            chosen[secrets.randbelow(words)] += secrets.choice(DIGITS)
+        if add_symbol:
+            chosen[secrets.randbelow(words)] += secrets.choice(SYMBOLS)
+        passphrase = separator.join(chosen)
+        if blocklist is None or passphrase not in blocklist:
+            return passphrase
+    raise ValueError("Nearly every passphrase with these settings is in the blocklist. Please use more words.")
+
+
+def passphrase_chunks(count, wordlist, chunk_size, **options):
+    """Yields lists of passphrases made by make_passphrase(wordlist, **options), chunk_size at a time."""
+    for start in range(0, count, chunk_size):
+        yield [make_passphrase(wordlist, **options) for _ in range(min(chunk_size, count - start))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate diceware-style passphrases.")
+    parser.add_argument("--wordlist", help=f"One word per line (default: the first of {', '.join(WORDLIST_FILES)}).")
+    parser.add_argument("--words", type=int, default=6, help="Words per passphrase (default: 6).")
+    parser.add_argument("--separator", default="-", help="Text between the words (default: -).")
+    parser.add_argument("--count", type=int, default=1, help="Number of passphrases to print (default: 1).")
+    parser.add_argument("--capitalize", action="store_true", help="Capitalize every word.")
+    parser.add_argument("--digit", action="store_true", help="Add a digit to one word.")
+    parser.add_argument("--symbol", action="store_true", help="Add a symbol to one word.")
+    args = parser.parse_args(argv)
+
+    try:
+        wordlist = open_wordlist(args.wordlist)
+        if wordlist is None:
+            raise ValueError("No wordlist found; please give one with --wordlist.")
+        with wordlist:
+            for _ in range(args.count):
+                print(make_passphrase(wordlist, args.words, args.separator, args.capitalize, args.digit, args.symbol))
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Password strength estimates for the Password Generator.
+
+Three kinds of estimate, all in bits of entropy:
+
+    settings_bits(length, classes)   for a password the generator would make: the
+                                     log2 of the number of possible passwords
+    passphrase_bits(wordlist_size, words, ...)
+                                     the same for a passphrase (password_passphrase.py)
+    score_password(password)         for any given password, e.g. a pasted one
+
+score_password() starts from the character pool the password draws from (the
+character types it contains) and gives every character log2(pool size) bits.
+Characters that continue a pattern from the previous character get only
+PATTERN_BITS instead: repeats ("aaa"), runs of the alphabet or digits ("abc",
+"321") and walks along a keyboard row ("qwerty", "asdf").
+
+All lookup tables are built once when the module is imported, and results are
+cached per input, so scoring on every keystroke costs a few microseconds.
+"""
+import math
+import string
+from functools import lru_cache
+
+PATTERN_BITS = 1.0 # Bits credited to a character that continues a repeat, sequence or keyboard walk
+OTHER_POOL_SIZE = 100 # Pool size assumed for characters outside printable ASCII
+
+# Labels by the lowest number of bits that earns them
+STRENGTH_LEVELS = [
+    (0, "Very weak"),
+    (28, "Weak"),
+    (36, "Fair"),
+    (60, "Strong"),
+    (80, "Very strong"),
+]
+
+# --- Tables built once ---
+
+CLASS_SETS = [string.ascii_lowercase, string.ascii_uppercase, string.digits, string.punctuation]
+OTHER_CLASS = 1 << len(CLASS_SETS)
+POOL_SIZES = [len(characters) for characters in CLASS_SETS] + [OTHER_POOL_SIZE]
+
+# Character -> bit of its character type
+CHARACTER_CLASS = {character: 1 << i for i, characters in enumerate(CLASS_SETS) for character in characters}
+
+# Bits per character for every combination of character types present
+POOL_BITS = []
+for mask in range(OTHER_CLASS << 1):
+    size = sum(POOL_SIZES[i] for i in range(len(POOL_SIZES)) if mask & (1 << i))
+    POOL_BITS.append(math.log2(size) if size else 0.0)
+
+KEYBOARD_ROWS = ["`1234567890-=", "qwertyuiop[]\\", "asdfghjkl;'", "zxcvbnm,./"]
+SEQUENCES = [string.ascii_lowercase, string.ascii_uppercase, string.digits]
+
+# Pairs of characters where the second one continues a pattern started by the first
+PATTERN_PAIRS = set()
+for row in KEYBOARD_ROWS + SEQUENCES:
+    for first, second in zip(row, row[1:]):
+        PATTERN_PAIRS.update({first + second, second + first})
+        if row in KEYBOARD_ROWS and first.isalpha() and second.isalpha():
+            PATTERN_PAIRS.update({first.upper() + second.upper(), second.upper() + first.upper()})
+
+
+def strength_label(bits):
+    """Returns the label ("Very weak" to "Very strong") for an entropy estimate."""
+    label = STRENGTH_LEVELS[0][1]
+    for minimum, name in STRENGTH_LEVELS:
+        if bits >= minimum:
+            label = name
+    return label
+
+
+@lru_cache(maxsize=256)
+def score_password(password):
+    """
+    Estimates the entropy of a given password, penalizing repeats, sequences and keyboard walks.
+    :return: (bits, label)
+    """
+    mask = 0
+    for character in password:
+        mask |= CHARACTER_CLASS.get(character, OTHER_CLASS)
+    bits_per_character = POOL_BITS[mask]
+
+    bits = 0.0
+    previous = None
+    for character in password:
+        if previous is not None and (character == previous or previous + character in PATTERN_PAIRS):
+            bits += PATTERN_BITS
+        else:
+            bits += bits_per_character
+        previous = character
+    return bits, strength_label(bits)
+
+
+@lru_cache(maxsize=256)
+def settings_bits(length, classes):
+    """
+    Returns the entropy in bits of a password made by password_core from these settings:
+    log2 of the number of passwords of this length with at least one character of each class.
+    :param classes: Tuple of character sets, see password_core.character_classes().
+    """
+    if not classes or length < len(classes):
+        return 0.0
+    # Inclusion-exclusion over the classes that could be missing
+    count = 0
+    for missing in range(1 << len(classes)):
+        size = sum(len(characters) for i, characters in enumerate(classes) if not missing & (1 << i))
+        count += (-1) ** bin(missing).count("1") * size ** length
+    return math.log2(count)
+
+
+@lru_cache(maxsize=256)
+def passphrase_bits(wordlist_size, words, add_digit=False, add_symbol=False):
+    """
+    Returns the entropy in bits of a passphrase made by password_passphrase.make_passphrase():
+    words * log2(wordlist_size), plus the choice of character and word for an added digit or symbol.
+    """
+    if wordlist_size < 1 or words < 1:
+        return 0.0
+    bits = words * math.log2(wordlist_size)
+    if add_digit:
+        bits += math.log2(len(string.digits) * words)
+    if add_symbol:
+        bits += math.log2(len(string.punctuation) * words)
+    return bits
@@ -0,0 +1,67 @@
+"""
+Tests for calculator_batch: per-row errors, CSV files, and that the NumPy and
+pure-Python paths give the same values and errors. The comparison is skipped
+when NumPy is not installed.
+
+Usage: python -m pytest -q tests
+"""
+import io
+import math
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from calculator_batch import (DIVIDE_BY_ZERO, INVALID_INPUT, TOO_LARGE, evaluate_batch, evaluate_csv)
+from calculator_engine import ExpressionError
+
+VALUES = [0, -0.0, 1, -1, 2, 0.5, -2.5, 2.675, 1e308, -1e308, 5e-324, 710, -710, 1e16, "", "abc", "inf", "nan"]
+EXPRESSIONS = [
+    "x + y", "x - y", "x * y", "x / y", "x % y", "x ^ y", "1 / (x - y)", "-x % y",
+    "sqrt(x)", "abs(x)", "floor(x)", "ceil(x)", "exp(x)", "ln(x)", "log(x)", "log(x, y)", "log10(x)", "log2(x)",
+    "sin(x)", "cos(x)", "tan(x)", "asin(x)", "acos(x)", "atan(x)", "min(x, y)", "max(x, y, 1)",
+    "round(x)", "round(x, 2)", "round(x, y)", "round(x, 0.5)",
+    "atan(exp(x))", "log(x) * 0", "exp(x) - exp(x)", "(-x) ^ 0.5", "0 ^ x", "1 / 0 + x",
+]
+
+
+def grid():
+    """Every pair of VALUES as the columns x and y."""
+    return {"x": [a for a in VALUES for b in VALUES], "y": [b for a in VALUES for b in VALUES]}
+
+
+def test_row_errors():
+    result = evaluate_batch("a / b", {"a": ["1", "2", "x", "1e308", "3"], "b": [4, 0, 1, 1e-10, ""]}, use_numpy=False)
+    assert result.values[0] == 0.25
+    assert result.errors == {1: DIVIDE_BY_ZERO, 2: INVALID_INPUT, 3: TOO_LARGE, 4: INVALID_INPUT}
+
+
+def test_domain_error():
+    result = evaluate_batch("log(x)", {"x": [0, 1]}, use_numpy=False)
+    assert result.errors == {0: "Invalid operation: math domain error"}
+
+
+def test_missing_column():
+    with pytest.raises(ExpressionError, match="No column given for: qty"):
+        evaluate_batch("price * qty", {"price": [1]})
+
+
+def test_csv():
+    output = io.StringIO()
+    total, failed = evaluate_csv("price * qty", io.StringIO("price,qty\n2.5,4\n1,x\n"), output, use_numpy=False)
+    assert (total, failed) == (2, 1)
+    assert output.getvalue().splitlines() == ["price,qty,result,error", "2.5,4,10.0,", f"1,x,,{INVALID_INPUT}"]
+
+
+@pytest.mark.parametrize("expression", EXPRESSIONS)
+def test_numpy_matches_python(expression):
+    pytest.importorskip("numpy")
+    columns = grid()
+    python = list(evaluate_batch(expression, columns, use_numpy=False).rows())
+    vectorized = list(evaluate_batch(expression, columns, use_numpy=True).rows())
+    for row, ((value, error), (numpy_value, numpy_error)) in enumerate(zip(python, vectorized)):
+        cells = (columns["x"][row], columns["y"][row])
+        assert numpy_error == error, cells
+        if value is not None:
+            assert math.isclose(numpy_value, value, rel_tol=1e-12, abs_tol=1e-300), cells
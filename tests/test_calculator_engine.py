@@ -0,0 +1,85 @@
+"""
+Tests for the expression parser and evaluator in calculator_engine.
+
+Usage: python -m pytest -q tests
+"""
+import math
+import os
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from calculator_engine import ExpressionError, evaluate
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2 * (3 + sqrt(16))^2", 98),
+    ("-2^2", -4), # Unary minus binds looser than ^
+    ("2^3^2", 512), # ^ is right associative
+    ("2**-1", 0.5),
+    ("7 % 4 + 10 / 4", 5.5),
+    (".5 + 1e-1", 0.6),
+    ("round(2.567, 2)", 2.57),
+    ("log(8, 2)", 3),
+    ("min(3, 1, 2) + max(4, 5)", 6),
+    ("2 * pi", math.tau),
+])
+def test_evaluates(text, expected):
+    assert evaluate(text) == pytest.approx(expected)
+
+
+def test_whole_numbers_stay_exact():
+    assert evaluate("2^64 + 1") == 18446744073709551617
+
+
+def test_variables():
+    assert evaluate("price * qty", price=2.5, qty=4) == 10
+    with pytest.raises(ExpressionError, match="No value given for: qty"):
+        evaluate("price * qty", price=2.5)
+
+
+@pytest.mark.parametrize("text, message", [
+    ("2 +", "incomplete"),
+    ("(1 + 2", "Expected ')'"),
+    ("1 + 2)", "Unexpected ')' at position 6"),
+    ("2 $ 3", "Unexpected character '$' at position 3"),
+    ("foo(1)", "Unknown function 'foo'"),
+    ("sqrt", "needs parentheses"),
+    ("sqrt()", "Unexpected ')'"),
+    ("floor(1, 2)", "'floor' takes 1 argument but got 2"),
+    ("log(1, 2, 3)", "'log' takes 1 to 2 arguments but got 3"),
+    ("max(3)", "'max' takes at least 2 arguments but got 1"),
+])
+def test_parse_errors(text, message):
+    with pytest.raises(ExpressionError, match=re.escape(message)):
+        evaluate(text)
+
+
+@pytest.mark.parametrize("text", [
+    "(" * 2000 + "1" + ")" * 2000,
+    "-" * 5000 + "1",
+    "+".join(["1"] * 5000),
+    "^".join(["1"] * 5000),
+])
+def test_deep_nesting_is_an_expression_error(text):
+    with pytest.raises(ExpressionError, match="too long or too deeply nested"):
+        evaluate(text)
+
+
+def test_round_needs_whole_digits():
+    with pytest.raises(ValueError, match="whole number of digits"):
+        evaluate("round(1, 2.5)")
+
+
+@pytest.mark.parametrize("text, error", [
+    ("1 / 0", ZeroDivisionError),
+    ("sqrt(-1)", ValueError),
+    ("(-8)^(1/3)", ValueError), # Not a complex number
+    ("1e308 * 10", OverflowError),
+    ("(9^9999)^9999", OverflowError), # Computed as a float instead of running for minutes
+])
+def test_math_errors(text, error):
+    with pytest.raises(error):
+        evaluate(text)
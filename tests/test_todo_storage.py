@@ -0,0 +1,183 @@
+"""
+Tests that two JournalStorage objects sharing one task file end up with the same tasks,
+and that a failed write never leaves a change on disk twice.
+
+The convergence tests randomly interleaves changes, saves and poll() calls of two writers, as
+two windows (or a window and todo_cli.py) would make them, with a small
+compact_every so the log is folded into the snapshot many times along the way.
+After a final poll() both must hold exactly what a fresh load() reads from disk.
+
+Usage: python -m pytest -q tests
+"""
+import json
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import todo_storage
+from todo_model import Task
+from todo_storage import BackgroundWriter, JournalStorage, apply_change
+
+STEPS = 200
+COMPACT_EVERY = 7
+
+
+def apply_poll(storage, tasks):
+    """Applies what storage.poll() reports to the in-memory list, like the window does."""
+    result = storage.poll()
+    if result is None:
+        return
+    kind, payload = result
+    if kind == "reload":
+        tasks[:] = payload
+    else:
+        for change in payload:
+            apply_change(tasks, *change)
+
+
+def random_changes(rng, tasks, names):
+    """Makes one to three random changes to tasks and returns them as (op, index, task) tuples."""
+    changes = []
+    for _ in range(rng.randint(1, 3)):
+        kind = rng.random()
+        if kind < 0.4 or not tasks:
+            index = rng.randint(0, len(tasks))
+            task = Task(f"Added {next(names)}")
+            tasks.insert(index, task)
+            changes.append(("add", index, task.copy()))
+        elif kind < 0.7:
+            index = rng.randrange(len(tasks))
+            tasks[index] = Task(f"Updated {next(names)}", rng.random() < 0.5)
+            changes.append(("update", index, tasks[index].copy()))
+        else:
+            index = rng.randrange(len(tasks))
+            del tasks[index]
+            changes.append(("delete", index, None))
+    return changes
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_two_writers_converge(tmp_path, seed):
+    rng = random.Random(seed)
+    names = iter(range(1, 10 ** 6))
+    path = str(tmp_path / "tasks.json")
+    JournalStorage(path).save([Task(f"Task {i}") for i in range(5)])
+    writers = []
+    for _ in range(2):
+        storage = JournalStorage(path, compact_every=COMPACT_EVERY)
+        writers.append((storage, storage.load()))
+
+    try:
+        for _ in range(STEPS):
+            storage, tasks = rng.choice(writers)
+            action = rng.random()
+            if action < 0.3:
+                apply_poll(storage, tasks)
+            elif action < 0.35:
+                tasks.append(Task(f"Saved {next(names)}"))
+                storage.save(tasks)
+            else:
+                storage.record_many(random_changes(rng, tasks, names))
+
+        expected = JournalStorage(path).load()
+        for storage, tasks in writers:
+            apply_poll(storage, tasks)
+            assert tasks == expected
+    finally:
+        for storage, _ in writers:
+            storage.close()
+
+
+def fail_once(function):
+    """Wraps function so that its first call raises a "disk full" OSError."""
+    calls = []
+
+    def wrapper(*args):
+        calls.append(args)
+        if len(calls) == 1:
+            raise OSError(28, "No space left on device")
+        return function(*args)
+    return wrapper
+
+
+def test_failed_compaction_keeps_changes_once(tmp_path, monkeypatch):
+    path = str(tmp_path / "tasks.json")
+    JournalStorage(path).save([Task("a")])
+    monkeypatch.setattr(todo_storage, "write_json_atomic", fail_once(todo_storage.write_json_atomic))
+    writer = BackgroundWriter(JournalStorage(path, compact_every=3))
+    tasks = writer.load()
+    for i in range(3):
+        tasks.append(Task(f"new{i}"))
+        writer.record("add", len(tasks) - 1, tasks[-1].copy())
+    writer.flush()
+    assert writer.error is None and writer.unsaved_changes() == 0
+    tasks.append(Task("new3"))
+    writer.record("add", len(tasks) - 1, tasks[-1].copy()) # Compacts this time
+    writer.close()
+    assert JournalStorage(path).load() == tasks
+
+
+def test_failed_log_header_is_not_appended_to(tmp_path, monkeypatch):
+    path = str(tmp_path / "tasks.json")
+    storage = JournalStorage(path, compact_every=2)
+    tasks = [Task("a"), Task("b")]
+    storage.save(tasks)
+    storage.record_many([("add", 2, Task("c"))])
+
+    def open_full_disk(file, mode="r", *args, **kwargs):
+        if mode == "wb":
+            open(file, mode).close() # The old log is emptied before the header fails to write
+            raise OSError(28, "No space left on device")
+        return open(file, mode, *args, **kwargs)
+
+    # Compacts after the delete, but cannot start the new log
+    monkeypatch.setattr(todo_storage, "open", open_full_disk, raising=False)
+    storage.record_many([("delete", 0, None)])
+    monkeypatch.undo()
+    storage.record_many([("add", 0, Task("d"))])
+    storage.close()
+    assert JournalStorage(path).load() == [Task("d"), Task("b"), Task("c")]
+
+
+def test_rewrite_with_same_size_and_mtime_is_noticed(tmp_path, monkeypatch):
+    path = str(tmp_path / "tasks.json")
+    JournalStorage(path).save([Task("a"), Task("b")])
+    real_stat = os.stat
+
+    class CoarseStat:
+        """A stat result whose mtime never changes, as on a file system with coarse timestamps."""
+        st_mtime_ns = 0
+
+        def __init__(self, result):
+            self.result = result
+
+        def __getattr__(self, name):
+            return getattr(self.result, name)
+
+    monkeypatch.setattr(os, "stat", lambda *args, **kwargs: CoarseStat(real_stat(*args, **kwargs)))
+    first, second = JournalStorage(path), JournalStorage(path)
+    first.load()
+    second.load()
+    second.save([Task("c"), Task("d")]) # The same size as before
+    assert first.poll() == ("reload", [Task("c"), Task("d")])
+    first.close()
+    second.close()
+
+
+def test_log_from_older_version_is_replayed(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    storage = JournalStorage(path)
+    storage.save([Task("a")])
+    storage.record_many([("add", 1, Task("b"))])
+    storage.close()
+    with open(path + ".journal", "rb") as f:
+        header, *changes = f.readlines()
+    header = json.loads(header)
+    header["snapshot"] = header["snapshot"][1:] # Written without the inode number
+    with open(path + ".journal", "wb") as f:
+        f.write(json.dumps(header).encode() + b"\n" + b"".join(changes))
+    assert JournalStorage(path).load() == [Task("a"), Task("b")]
+    assert JournalStorage(path).load() == [Task("a"), Task("b")] # Folded into the snapshot, not lost
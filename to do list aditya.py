@@ -1,12 +1,58 @@
-import tkinter as tk
-from tkinter import messagebox
+import os
+from bisect import bisect_left
+
+from todo_history import CommandHistory
+from todo_index import ALL, COMPLETED, PENDING, TaskIndex
+from todo_io import batched, file_format, read_tasks, write_tasks
+from todo_model import Task
+from todo_storage import BackgroundWriter, JournalStorage, change_fits
+from ui_metrics import start_metrics
+
+# tkinter (and the listbox widget built on it) is only imported when a window is opened,
+# see load_tkinter. The task model and storage modules above never import it.
+tk = None
+filedialog = None
+messagebox = None
+VirtualListbox = None
+
+# Button callbacks timed when the app runs with --metrics (see ui_metrics)
+CALLBACKS = ("add_task", "update_task", "mark_complete", "delete_task", "save_tasks",
+             "undo", "redo", "import_tasks", "export_tasks")
+
+SYNC_MS = 1000 # How often to look for changes other windows or scripts made to the task file
+
+
+def load_tkinter():
+    """Imports tkinter into this module on first use."""
+    global tk, filedialog, messagebox, VirtualListbox
+    if tk is not None:
+        return
+    import tkinter
+    from tkinter import filedialog as tk_filedialog
+    from tkinter import messagebox as tk_messagebox
+    from virtual_listbox import VirtualListbox as listbox_class
+    tk, filedialog, messagebox, VirtualListbox = tkinter, tk_filedialog, tk_messagebox, listbox_class
 
 class TodoApp:
-    def __init__(self, master):
+    def __init__(self, master, storage=None):
+        """
+        :param master: The window (Tk root or Toplevel) or any other widget to build the app in.
+        :param storage: Task storage backend; a JournalStorage on tasks.json by default.
+        """
+        load_tkinter()
         self.master = master
-        master.title("To-Do List Application")
+        if isinstance(master, tk.Wm): # Not when placed in a frame, e.g. a tab
+            master.title("To-Do List Application")
 
-        self.tasks = [] # To store our tasks
+        self.tasks = [] # To store our tasks (Task objects)
+        # Where tasks are kept on disk; each edit only appends to a journal by default.
+        # All writing happens on a background thread so the buttons never wait for the disk.
+        self.storage = BackgroundWriter(storage if storage is not None else JournalStorage("tasks.json"))
+        self.index = TaskIndex() # Word index used by the search box
+        # Keys (see TaskIndex) of the tasks shown in the listbox while a filter is active,
+        # in row order. None means every task is shown and row numbers equal task indices.
+        self.visible_keys = None
+        self.history = CommandHistory() # Undo/redo steps, oldest ones are dropped past its limits
 
         # --- GUI Elements ---
         self.task_label = tk.Label(master, text="New Task / Edit Task:")
@@ -31,37 +77,100 @@ class TodoApp:
         self.delete_button = tk.Button(button_frame, text="Delete Task", command=self.delete_task)
         self.delete_button.grid(row=0, column=3, padx=5)
 
-        self.task_listbox = tk.Listbox(master, width=60, height=15) # Increased width/height
+        self.undo_button = tk.Button(button_frame, text="Undo", command=self.undo)
+        self.undo_button.grid(row=1, column=0, padx=5, pady=5)
+
+        self.import_button = tk.Button(button_frame, text="Import...", command=self.import_tasks)
+        self.import_button.grid(row=1, column=1, padx=5, pady=5)
+
+        self.export_button = tk.Button(button_frame, text="Export...", command=self.export_tasks)
+        self.export_button.grid(row=1, column=2, padx=5, pady=5)
+
+        self.redo_button = tk.Button(button_frame, text="Redo", command=self.redo)
+        self.redo_button.grid(row=1, column=3, padx=5, pady=5)
+
+        # Keyboard shortcuts for undo/redo
+        master.bind("<Control-z>", lambda event: self.undo())
+        master.bind("<Control-y>", lambda event: self.redo())
+
+        # Search box and status filter; the list updates as you type
+        search_frame = tk.Frame(master)
+        search_frame.pack(pady=5)
+
+        tk.Label(search_frame, text="Search:").grid(row=0, column=0, padx=5)
+        self.search_var = tk.StringVar()
+        self.search_entry = tk.Entry(search_frame, textvariable=self.search_var, width=30)
+        self.search_entry.grid(row=0, column=1, padx=5)
+
+        self.status_var = tk.StringVar(value=ALL)
+        self.status_menu = tk.OptionMenu(search_frame, self.status_var, ALL, PENDING, COMPLETED)
+        self.status_menu.grid(row=0, column=2, padx=5)
+
+        self.search_var.trace_add("write", self.apply_filter)
+        self.status_var.trace_add("write", self.apply_filter)
+
+        # Only the rows on screen exist as Tk items; the rest are drawn on demand while scrolling
+        self.task_listbox = VirtualListbox(
+            master,
+            row_count=self.row_count,
+            get_row=self.get_row,
+            on_select=self.load_selected_task_to_entry, # Fill the entry when a task is selected
+            width=60,
+            height=15
+        )
         self.task_listbox.pack(pady=10)
 
-        # Bind an event to the listbox selection
-        self.task_listbox.bind('<<ListboxSelect>>', self.load_selected_task_to_entry)
+        # Shows whether there are edits that have not reached the disk yet
+        self.save_status_var = tk.StringVar(value="All changes saved")
+        self.save_status_label = tk.Label(master, textvariable=self.save_status_var, fg="gray")
+        self.save_status_label.pack(pady=(0, 5))
+
+        # Progress of a running import or export
+        self.progress_var = tk.StringVar()
+        tk.Label(master, textvariable=self.progress_var).pack(pady=(0, 5))
+
+        # Make sure pending edits are written before the window goes away
+        if isinstance(master, tk.Wm):
+            master.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.save_status_job = None # after() id of the next update_save_status()
+        self.sync_job = None # after() id of the next check_for_changes()
+        self.import_job = None # (after() id, file) of the next import_batch() while importing
+        self.export_job = None # (after() id, file, format, batches) of the next export_batch() while exporting
 
         # Load tasks when the app starts
         self.load_tasks()
         self.update_task_listbox()
+        self.update_save_status()
+        self.sync_job = self.master.after(SYNC_MS, self.check_for_changes)
 
     def add_task(self):
+        if self.import_running():
+            return
         task = self.task_entry.get().strip()
         if task:
-            self.tasks.append({"task": task, "completed": False})
+            index = len(self.tasks)
+            key = self.insert_task(index, Task(task, False))
+            self.history.record("add", index, after=self.tasks[index].copy(), key=key)
             self.task_entry.delete(0, tk.END) # Clear the entry field
-            self.update_task_listbox()
-            self.save_tasks()
+            new_row = self.task_row(index)
+            if new_row is not None:
+                self.task_listbox.see(new_row) # Scroll to the new task
         else:
             messagebox.showwarning("Warning", "Task cannot be empty!")
 
     def update_task(self):
+        if self.import_running():
+            return
         try:
-            selected_index = self.task_listbox.curselection()[0]
+            selected_index = self.selected_task_index()
             new_task_text = self.task_entry.get().strip()
 
             if new_task_text:
                 # Update the task text in our list
-                self.tasks[selected_index]["task"] = new_task_text
+                before = self.tasks[selected_index].copy()
+                self.change_task(selected_index, Task(new_task_text, before.completed))
+                self.history.record("update", selected_index, before, self.tasks[selected_index].copy())
                 self.task_entry.delete(0, tk.END) # Clear entry after update
-                self.update_task_listbox()
-                self.save_tasks()
                 messagebox.showinfo("Success", "Task updated successfully!")
             else:
                 messagebox.showwarning("Warning", "Updated task text cannot be empty!")
@@ -71,58 +180,411 @@ class TodoApp:
     def load_selected_task_to_entry(self, event):
         """Loads the text of the selected task into the entry field for editing."""
         try:
-            selected_index = self.task_listbox.curselection()[0]
-            selected_task_text = self.tasks[selected_index]["task"]
+            selected_index = self.selected_task_index()
+            selected_task_text = self.tasks[selected_index].text
             self.task_entry.delete(0, tk.END) # Clear current entry
             self.task_entry.insert(0, selected_task_text) # Insert selected task text
         except IndexError:
             pass # No item selected, do nothing
 
     def update_task_listbox(self):
-        self.task_listbox.delete(0, tk.END) # Clear existing entries
-        for i, task_info in enumerate(self.tasks):
-            display_text = task_info["task"]
-            if task_info["completed"]:
-                display_text += " (Completed)"
-            self.task_listbox.insert(tk.END, display_text)
-            if task_info["completed"]:
-                self.task_listbox.itemconfig(i, {'fg': 'gray', 'strikeThrough': 1}) # Gray out and strikethrough
+        """
+        Redraws the whole listbox. Only used on load and when the search changes;
+        single edits go through the row helpers below.
+        """
+        self.task_listbox.reset()
+
+    def row_count(self):
+        """Returns the number of rows in the listbox."""
+        return len(self.tasks) if self.visible_keys is None else len(self.visible_keys)
+
+    def get_row(self, row):
+        """Returns the text and item options the listbox should show for a row."""
+        task_info = self.tasks[self.row_to_task_index(row)]
+        return self.format_task(task_info), {'fg': 'gray'} if task_info.completed else None # Gray out completed tasks
+
+    def apply_filter(self, *args):
+        """Shows only the tasks matching the search box and status filter."""
+        self.visible_keys = self.index.search(self.search_var.get(), self.status_var.get())
+        self.update_task_listbox()
+
+    def selected_task_index(self):
+        """Returns the index in self.tasks of the selected row. Raises IndexError if nothing is selected."""
+        return self.row_to_task_index(self.task_listbox.curselection()[0])
+
+    def row_to_task_index(self, row):
+        """Returns the index in self.tasks of the task shown in a listbox row."""
+        if self.visible_keys is None:
+            return row
+        return self.index.position(self.visible_keys[row])
+
+    def task_row(self, index):
+        """Returns the listbox row showing self.tasks[index], or None if it is filtered out."""
+        if self.visible_keys is None:
+            return index
+        key = self.index.keys[index]
+        row = bisect_left(self.visible_keys, key)
+        if row < len(self.visible_keys) and self.visible_keys[row] == key:
+            return row
+        return None
+
+    def format_task(self, task_info):
+        """Returns the text shown in the listbox for a single task."""
+        display_text = task_info.text
+        if task_info.completed:
+            display_text += " (Completed)"
+        return display_text
+
+    def insert_task_row(self, index):
+        """Inserts the row for self.tasks[index] without touching the other rows, if it passes the filter."""
+        row = index
+        renumbered, self.index.renumbered = self.index.renumbered, None
+        if self.visible_keys is not None:
+            if renumbered is not None:
+                # The index moved keys up to make room for this task; move the shown keys along
+                first = bisect_left(self.visible_keys, renumbered)
+                self.visible_keys[first:] = [key + 1 for key in self.visible_keys[first:]]
+            if not self.index.matches(index, self.search_var.get(), self.status_var.get()):
+                return
+            key = self.index.keys[index]
+            row = bisect_left(self.visible_keys, key)
+            self.visible_keys.insert(row, key)
+        self.task_listbox.rows_inserted(row)
+
+    def refresh_task_row(self, index, select=True):
+        """Redraws a single row after its task changed, keeping the selection on it if select is true."""
+        row = self.task_row(index)
+        if row is not None and (self.visible_keys is None or
+                                self.index.matches(index, self.search_var.get(), self.status_var.get())):
+            self.task_listbox.row_changed(row)
+        else:
+            # The change moved the task into or out of the current filter
+            self.delete_task_row(row)
+            self.insert_task_row(index)
+            row = self.task_row(index)
+        if row is not None and select:
+            self.task_listbox.selection_set(row)
+
+    def delete_task_row(self, row):
+        """Removes a row (from task_row(), may be None) whose task was deleted or no longer matches the filter."""
+        if row is not None:
+            if self.visible_keys is not None:
+                del self.visible_keys[row]
+            self.task_listbox.rows_deleted(row)
 
     def mark_complete(self):
+        if self.import_running():
+            return
         try:
-            selected_index = self.task_listbox.curselection()[0]
+            selected_index = self.selected_task_index()
             # Toggle the completed status
-            self.tasks[selected_index]["completed"] = not self.tasks[selected_index]["completed"]
-            self.update_task_listbox()
-            self.save_tasks()
+            before = self.tasks[selected_index].copy()
+            self.change_task(selected_index, Task(before.text, not before.completed))
+            self.history.record("update", selected_index, before, self.tasks[selected_index].copy())
         except IndexError:
             messagebox.showwarning("Warning", "Please select a task to mark/unmark complete.")
 
     def delete_task(self):
+        if self.import_running():
+            return
         try:
-            selected_index = self.task_listbox.curselection()[0]
-            del self.tasks[selected_index]
-            self.update_task_listbox()
-            self.save_tasks()
+            selected_index = self.selected_task_index()
+            task, key = self.remove_task(selected_index)
+            self.history.record("delete", selected_index, before=task, key=key)
             self.task_entry.delete(0, tk.END) # Clear entry after deleting
         except IndexError:
             messagebox.showwarning("Warning", "Please select a task to delete.")
 
+    # --- Single-task changes shared by the buttons and undo/redo ---
+    # Each one updates the list, the search index, the listbox row and the storage.
+
+    def insert_task(self, index, task, key=None):
+        """Inserts task at index. key is its old index key when a deleted task is restored."""
+        self.tasks.insert(index, task)
+        key = self.index.insert(index, task, key)
+        self.insert_task_row(index)
+        self.save_change("add", index)
+        return key
+
+    def change_task(self, index, new_values):
+        """Copies the text and completed state of new_values into the task at index."""
+        task = self.tasks[index]
+        task.text = new_values.text
+        task.completed = new_values.completed
+        self.index.update(index, task)
+        self.refresh_task_row(index)
+        self.save_change("update", index)
+
+    def remove_task(self, index):
+        """Removes the task at index and returns it together with its index key."""
+        row = self.task_row(index)
+        task = self.tasks.pop(index)
+        key = self.index.remove(index)
+        self.delete_task_row(row)
+        self.save_change("delete", index)
+        return task, key
+
+    def apply_external_change(self, op, index, task):
+        """Applies a change another program made, like the helpers above but without storing it again."""
+        if op == "add":
+            self.tasks.insert(index, task)
+            self.index.insert(index, task)
+            self.insert_task_row(index)
+        elif op == "update":
+            self.tasks[index].text = task.text
+            self.tasks[index].completed = task.completed
+            self.index.update(index, self.tasks[index])
+            self.refresh_task_row(index, select=False)
+        else:
+            row = self.task_row(index)
+            self.tasks.pop(index)
+            self.index.remove(index)
+            self.delete_task_row(row)
+
+    def undo(self):
+        """Reverses the last change. Only the affected task and row are touched."""
+        if self.import_running():
+            return
+        entry = self.history.undo()
+        if entry is None:
+            self.master.bell()
+            return
+        if entry.op == "add":
+            self.remove_task(entry.index)
+        elif entry.op == "update":
+            self.change_task(entry.index, entry.before)
+        else:
+            self.insert_task(entry.index, entry.before.copy(), entry.key)
+        self.show_task(entry.index)
+
+    def redo(self):
+        """Applies the last undone change again."""
+        if self.import_running():
+            return
+        entry = self.history.redo()
+        if entry is None:
+            self.master.bell()
+            return
+        if entry.op == "add":
+            self.insert_task(entry.index, entry.after.copy(), entry.key)
+        elif entry.op == "update":
+            self.change_task(entry.index, entry.after)
+        else:
+            self.remove_task(entry.index)
+        self.show_task(entry.index)
+
+    def show_task(self, index):
+        """Scrolls to and selects the task at index, if it exists and is shown."""
+        row = self.task_row(index) if index < len(self.tasks) else None
+        if row is not None:
+            self.task_listbox.see(row)
+            self.task_listbox.selection_set(row)
+
+    def append_tasks(self, new_tasks):
+        """Adds a batch of tasks at the end of the list, updating the index and listbox once per batch."""
+        start = len(self.tasks)
+        self.tasks.extend(new_tasks)
+        for i in range(start, len(self.tasks)):
+            self.index.insert(i, self.tasks[i])
+        if self.visible_keys is None:
+            self.task_listbox.rows_inserted(start, len(new_tasks))
+        else:
+            first_row = len(self.visible_keys)
+            query, status = self.search_var.get(), self.status_var.get()
+            for i in range(start, len(self.tasks)):
+                if self.index.matches(i, query, status):
+                    self.visible_keys.append(self.index.keys[i]) # New keys are the largest, so the list stays sorted
+            if len(self.visible_keys) > first_row:
+                self.task_listbox.rows_inserted(first_row, len(self.visible_keys) - first_row)
+
+    def import_tasks(self):
+        """Imports tasks from a JSON Lines or CSV file, a batch at a time so the window stays responsive."""
+        path = filedialog.askopenfilename(
+            title="Import Tasks",
+            filetypes=[("Task files", "*.jsonl *.ndjson *.csv"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            fmt = file_format(path)
+            total_bytes = os.path.getsize(path) or 1
+            f = open(path, "rb")
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Import Error", str(e))
+            return
+        # The imported tasks are only saved at the end, so nothing may refer to their positions before that
+        self.set_editing(False)
+        self.import_batch(f, batched(read_tasks(f, fmt)), total_bytes, 0)
+
+    def import_batch(self, f, batches, total_bytes, imported):
+        """Imports the next batch, then schedules itself again until the file is done."""
+        try:
+            batch = next(batches, None)
+        except (OSError, ValueError) as e:
+            batch = None
+            messagebox.showerror("Import Error", f"{e}\nThe {imported} tasks before this point were imported.")
+        if batch is None:
+            f.close()
+            self.import_job = None
+            self.set_editing(True)
+            self.progress_var.set(f"Imported {imported} tasks.")
+            self.save_tasks() # One full save instead of journaling every imported task
+            return
+        self.append_tasks(batch)
+        imported += len(batch)
+        self.progress_var.set(f"Importing... {imported} tasks ({f.tell() * 100 // total_bytes}%)")
+        self.import_job = (self.master.after(1, self.import_batch, f, batches, total_bytes, imported), f)
+
+    def import_running(self):
+        """Asks the user to wait if an import is running. Edits would refer to tasks that are not saved yet."""
+        if self.import_job is None:
+            return False
+        messagebox.showinfo("Import Running", "Please wait until the import has finished.")
+        return True
+
+    def set_editing(self, enabled):
+        """Enables or disables the buttons that change the task list, e.g. while an import is running."""
+        state = "normal" if enabled else "disabled"
+        for button in (self.add_button, self.update_button, self.complete_button, self.delete_button,
+                       self.undo_button, self.redo_button, self.import_button):
+            button.config(state=state)
+
+    def export_tasks(self):
+        """Exports all tasks to a JSON Lines or CSV file, a batch at a time."""
+        path = filedialog.asksaveasfilename(
+            title="Export Tasks",
+            defaultextension=".jsonl",
+            filetypes=[("JSON Lines", "*.jsonl"), ("CSV", "*.csv")]
+        )
+        if not path:
+            return
+        try:
+            fmt = file_format(path)
+            f = open(path, "w", newline="", encoding="utf-8")
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Export Error", str(e))
+            return
+        self.export_button.config(state="disabled")
+        # Copy the list (not the tasks) so edits made during the export cannot skip or repeat rows
+        self.export_batch(f, fmt, batched(list(self.tasks)), len(self.tasks), 0)
+
+    def export_batch(self, f, fmt, batches, total, exported):
+        """Writes the next batch, then schedules itself again until every task is written."""
+        try:
+            batch = next(batches, None)
+            if batch is not None:
+                exported += write_tasks(f, batch, fmt, header=exported == 0)
+            elif not exported:
+                write_tasks(f, [], fmt) # Still write the CSV header for an empty list
+        except OSError as e:
+            batch = None
+            messagebox.showerror("Export Error", str(e))
+        if batch is None:
+            f.close()
+            self.export_job = None
+            self.export_button.config(state="normal")
+            self.progress_var.set(f"Exported {exported} tasks.")
+            return
+        self.progress_var.set(f"Exporting... {exported} of {total} tasks")
+        self.export_job = (self.master.after(1, self.export_batch, f, fmt, batches, total, exported), f, fmt, batches)
+
+    def save_change(self, op, index):
+        """Stores a single change ("add", "update" or "delete") of the task at index."""
+        task = self.tasks[index].copy() if op != "delete" else None
+        self.storage.record(op, index, task)
+
     def save_tasks(self):
-        # A simple way to save to a file using JSON for better structure
-        import json
-        with open("tasks.json", "w") as f:
-            json.dump(self.tasks, f)
+        """Writes the complete task list to storage."""
+        self.storage.save(self.tasks)
 
-    def load_tasks(self):
-        import json
+    def update_save_status(self):
+        """Refreshes the "unsaved changes" indicator. Re-schedules itself every 200 ms."""
+        if self.storage.error is not None:
+            self.save_status_var.set(f"Saving failed: {self.storage.error}")
+            self.save_status_label.config(fg="red")
+        elif self.storage.unsaved_changes():
+            self.save_status_var.set("Unsaved changes...")
+            self.save_status_label.config(fg="orange")
+        else:
+            self.save_status_var.set("All changes saved")
+            self.save_status_label.config(fg="gray")
+        self.save_status_job = self.master.after(200, self.update_save_status)
+
+    def check_for_changes(self):
+        """
+        Merges the changes other windows or scripts made to the task file since the last check,
+        touching only the affected rows. Re-schedules itself every SYNC_MS.
+        """
         try:
-            with open("tasks.json", "r") as f:
-                self.tasks = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.tasks = [] # Initialize as empty if file not found or corrupted
+            # Not during an import: a reload would drop the imported tasks, which are not saved yet
+            result = self.storage.poll() if self.import_job is None else None
+        except OSError:
+            result = None # Try again next time
+        if result is not None:
+            kind, payload = result
+            if kind == "changes":
+                for op, index, task in payload:
+                    if not change_fits(len(self.tasks), op, index):
+                        # Does not match our list after all; start over from what is on disk
+                        kind, payload = "reload", self.storage.load()
+                        break
+                    self.apply_external_change(op, index, task)
+            if kind == "reload":
+                self.tasks = payload
+                self.index.rebuild(self.tasks)
+                self.apply_filter()
+            self.history.clear() # The positions in the undo steps no longer match
+            self.progress_var.set("Merged changes made by another program.")
+        self.sync_job = self.master.after(SYNC_MS, self.check_for_changes)
+
+    def stop_transfers(self):
+        """Ends a running import or export at once: an import keeps the tasks read so far, an export is finished."""
+        if self.import_job is not None:
+            job, f = self.import_job
+            self.master.after_cancel(job)
+            f.close()
+            self.import_job = None
+            self.save_tasks()
+        if self.export_job is not None:
+            job, f, fmt, batches = self.export_job
+            self.master.after_cancel(job)
+            self.export_job = None
+            try:
+                for batch in batches:
+                    write_tasks(f, batch, fmt, header=False) # The first batch is always written already
+            except OSError:
+                pass # The window is closing; there is no one left to tell
+            finally:
+                f.close()
+
+    def on_close(self):
+        """
+        Finishes a running import or export and writes any pending changes, then closes the window.
+        If the changes cannot be written, offers to try again; the window stays open unless the
+        user chooses to close it without saving.
+        """
+        self.stop_transfers()
+        self.storage.flush()
+        while self.storage.unsaved_changes():
+            if not messagebox.askretrycancel("Save Error", f"Could not save your changes: {self.storage.error}"):
+                if not messagebox.askyesno("Unsaved Changes", "Close without saving? Your latest changes will be lost."):
+                    return # The background writer keeps trying while the window is open
+                break
+            self.storage.flush()
+        self.storage.close()
+        for job in (self.save_status_job, self.sync_job):
+            if job is not None:
+                self.master.after_cancel(job)
+        self.master.destroy()
+
+    def load_tasks(self):
+        # A missing file gives an empty list; a corrupted one is kept aside as tasks.json.corrupt
+        self.tasks = self.storage.load()
+        self.index.rebuild(self.tasks)
 
 if __name__ == "__main__":
+    load_tkinter()
     root = tk.Tk()
+    start_metrics(root, TodoApp, CALLBACKS)
     app = TodoApp(root)
     root.mainloop()
@@ -0,0 +1,95 @@
+"""
+Command line access to the task list, without opening the To-Do List window.
+
+Uses the same task file and storage as the application, so changes made here
+show up the next time the window is opened:
+
+    python todo_cli.py add "Buy milk"
+    python todo_cli.py list --status pending --search milk
+    python todo_cli.py done 3
+    python todo_cli.py delete 3
+
+Tasks are numbered from 1 in list order, as printed by "list". Importing and
+exporting whole files is done by todo_io.py.
+"""
+import argparse
+import sys
+
+from todo_index import ALL, COMPLETED, PENDING, TaskIndex
+from todo_model import Task
+from todo_storage import JournalStorage
+
+STATUS_CHOICES = {"all": ALL, "pending": PENDING, "completed": COMPLETED}
+
+
+def format_line(number, task):
+    """Returns the line printed for one task by the list command."""
+    return f"{number:>4}. [{'x' if task.completed else ' '}] {task.text}"
+
+
+def list_tasks(tasks, query="", status=ALL):
+    """Yields (number, task) for the tasks matching a search text and status filter."""
+    index = TaskIndex()
+    index.rebuild(tasks)
+    keys = index.search(query, status)
+    if keys is None:
+        yield from enumerate(tasks, 1)
+        return
+    for key in keys:
+        position = index.position(key)
+        yield position + 1, tasks[position]
+
+
+def task_position(tasks, number):
+    """Turns a task number as printed by list into a list position."""
+    if not 1 <= number <= len(tasks):
+        raise ValueError(f"There is no task {number}; the list has {len(tasks)} tasks.")
+    return number - 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the to-do list from the command line.")
+    parser.add_argument("--store", default="tasks.json", help="The task file used by the app (default: tasks.json).")
+    commands = parser.add_subparsers(dest="command", required=True)
+    list_parser = commands.add_parser("list", help="Print the tasks.")
+    list_parser.add_argument("--status", choices=list(STATUS_CHOICES), default="all")
+    list_parser.add_argument("--search", default="", help="Only tasks containing words starting with these.")
+    add_parser = commands.add_parser("add", help="Add a task at the end of the list.")
+    add_parser.add_argument("text", nargs="+")
+    for name, description in (("done", "Mark a task as completed."), ("undone", "Mark a task as not completed."),
+                              ("delete", "Delete a task.")):
+        command_parser = commands.add_parser(name, help=description)
+        command_parser.add_argument("number", type=int, help="The task number shown by list.")
+    args = parser.parse_args(argv)
+
+    storage = JournalStorage(args.store)
+    try:
+        tasks = storage.load()
+        if args.command == "list":
+            for number, task in list_tasks(tasks, args.search, STATUS_CHOICES[args.status]):
+                print(format_line(number, task))
+        elif args.command == "add":
+            text = " ".join(args.text).strip()
+            if not text:
+                raise ValueError("Task cannot be empty!")
+            storage.record("add", len(tasks), Task(text, False))
+            print(format_line(len(tasks) + 1, Task(text, False)))
+        elif args.command == "delete":
+            position = task_position(tasks, args.number)
+            storage.record("delete", position)
+            print(f"Deleted: {tasks[position].text}")
+        else:
+            position = task_position(tasks, args.number)
+            task = Task(tasks[position].text, args.command == "done")
+            storage.record("update", position, task)
+            print(format_line(args.number, task))
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        storage.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
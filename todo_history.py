@@ -0,0 +1,82 @@
+"""
+Undo/redo history for the To-Do List application.
+
+Instead of copying the whole task list before every change, the history keeps
+one small entry per change that holds just enough to reverse it: the kind of
+change, the position, and the task before and after. Undoing or redoing an
+entry therefore only touches one task, however long the list is.
+
+The history is bounded both by number of entries and by an estimate of the
+memory they use; when either limit is exceeded the oldest entries are dropped.
+"""
+import sys
+from collections import deque
+
+ENTRY_OVERHEAD = 200 # Rough size in bytes of one entry without the task texts
+
+
+class HistoryEntry:
+    __slots__ = ("op", "index", "before", "after", "key", "size")
+
+    def __init__(self, op, index, before, after, key):
+        """
+        :param op: "add", "update" or "delete", as passed to the storage.
+        :param index: Position of the task in the task list.
+        :param before: Copy of the task before the change (None for "add").
+        :param after: Copy of the task after the change (None for "delete").
+        :param key: The task's key in the TaskIndex, so a restored task keeps its place in it.
+        """
+        self.op = op
+        self.index = index
+        self.before = before
+        self.after = after
+        self.key = key
+        self.size = ENTRY_OVERHEAD
+        for task in (before, after):
+            if task is not None:
+                self.size += sys.getsizeof(task.text)
+
+
+class CommandHistory:
+    def __init__(self, max_entries=1000, max_bytes=5000000):
+        """
+        :param max_entries: Most undo steps kept.
+        :param max_bytes: Rough limit for the memory used by the kept steps.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.undo_entries = deque()
+        self.redo_entries = []
+        self.size = 0 # Estimated bytes used by undo_entries and redo_entries
+
+    def record(self, op, index, before=None, after=None, key=None):
+        """Adds a change made by the user. Any redo steps are lost, like in most editors."""
+        for entry in self.redo_entries:
+            self.size -= entry.size
+        self.redo_entries.clear()
+        entry = HistoryEntry(op, index, before, after, key)
+        self.undo_entries.append(entry)
+        self.size += entry.size
+        while self.undo_entries and (len(self.undo_entries) > self.max_entries or self.size > self.max_bytes):
+            self.size -= self.undo_entries.popleft().size # Forget the oldest step
+
+    def undo(self):
+        """Returns the entry to reverse next and moves it to the redo list, or None."""
+        if not self.undo_entries:
+            return None
+        entry = self.undo_entries.pop()
+        self.redo_entries.append(entry)
+        return entry
+
+    def redo(self):
+        """Returns the entry to apply again and moves it back to the undo list, or None."""
+        if not self.redo_entries:
+            return None
+        entry = self.redo_entries.pop()
+        self.undo_entries.append(entry)
+        return entry
+
+    def clear(self):
+        self.undo_entries.clear()
+        self.redo_entries.clear()
+        self.size = 0
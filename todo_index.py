@@ -0,0 +1,211 @@
+"""
+Search index for the To-Do List application.
+
+TaskIndex keeps an inverted index from lower-cased words to tasks, plus one
+completed flag per task, so filtering does not have to scan every task text.
+It is updated one task at a time as tasks are added, edited or deleted.
+
+Tasks are identified inside the index by a key instead of their position,
+because positions shift whenever a task is deleted. Keys always increase
+along the list, so the position of a key can be found with a binary search
+and a sorted list of keys is already in list order.
+"""
+import re
+from bisect import bisect_left, bisect_right, insort
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Values accepted for the status filter
+ALL = "All"
+PENDING = "Pending"
+COMPLETED = "Completed"
+
+
+def tokenize(text):
+    """Splits text into the set of lower-cased words used by the index."""
+    return set(TOKEN_PATTERN.findall(text.lower()))
+
+
+class TaskIndex:
+    def __init__(self):
+        self.keys = [] # keys[i] is the key of the task at position i, always ascending
+        self.next_key = 0
+        self.postings = {} # word -> set of keys of the tasks containing it
+        self.vocabulary = [] # All indexed words, sorted, for prefix lookups
+        self.task_words = {} # key -> words of that task, needed to unindex it again
+        self.completed_flags = bytearray() # completed_flags[key] is 1 for completed tasks
+        # After rebuild() the word index is only filled in on the first search, so that
+        # loading a large list does not have to tokenize every task up front
+        self.tasks = None
+        self.words_built = True
+        self.renumbered = None # Lowest key moved up by renumber_from(), for callers keeping lists of keys
+
+    def rebuild(self, tasks):
+        """
+        Indexes a complete task list from scratch. Used once after loading.
+        The index keeps a reference to tasks and reads it again when the word index is built.
+        """
+        self.__init__()
+        self.keys = list(range(len(tasks)))
+        self.next_key = len(tasks)
+        self.completed_flags = bytearray(1 if task.completed else 0 for task in tasks)
+        self.tasks = tasks
+        self.words_built = False
+
+    def build_words(self):
+        """Fills in the word index from the task list given to rebuild(), if not done yet."""
+        if self.words_built:
+            return
+        postings = self.postings
+        for key, task in zip(self.keys, self.tasks):
+            words = tokenize(task.text)
+            self.task_words[key] = words
+            for word in words:
+                keys = postings.get(word)
+                if keys is None:
+                    postings[word] = keys = set()
+                keys.add(key)
+        self.vocabulary = sorted(postings) # Sorted once here instead of insort per new word
+        self.words_built = True
+
+    def insert(self, position, task, key=None):
+        """
+        Indexes a task that was inserted into the task list at position.
+        :param key: Key to use, e.g. the old key of a task that is being restored.
+            It has to fit between the keys of its neighbours.
+        :return: The key given to the task.
+        """
+        if key is not None:
+            # Only reuse the key if it still fits between the neighbours
+            if (position > 0 and self.keys[position - 1] >= key) or \
+                    (position < len(self.keys) and self.keys[position] <= key):
+                key = None
+        if key is None:
+            if position == len(self.keys):
+                key = self.next_key
+            elif position == 0 and self.keys[0] > 0:
+                key = self.keys[0] - 1
+            elif 0 < position and self.keys[position] - self.keys[position - 1] > 1:
+                key = self.keys[position - 1] + 1
+            else:
+                # No free key between the neighbours, so hand out fresh keys to everything after
+                self.renumber_from(position)
+                key = self.keys[position - 1] + 1 if position else 0
+        self.next_key = max(self.next_key, key + 1)
+        if len(self.completed_flags) < self.next_key:
+            self.completed_flags.extend(bytes(self.next_key - len(self.completed_flags)))
+        self.keys.insert(position, key)
+        self.completed_flags[key] = 1 if task.completed else 0
+        if self.words_built:
+            self.add_words(key, tokenize(task.text))
+        return key
+
+    def update(self, position, task):
+        """Re-indexes the task at position after its text or completed state changed."""
+        key = self.keys[position]
+        if self.words_built:
+            words = tokenize(task.text)
+            if words != self.task_words[key]:
+                self.remove_words(key)
+                self.add_words(key, words)
+        self.completed_flags[key] = 1 if task.completed else 0
+
+    def remove(self, position):
+        """
+        Unindexes the task at position, which is being deleted from the task list.
+        :return: The key the task had.
+        """
+        key = self.keys.pop(position)
+        if self.words_built:
+            self.remove_words(key)
+        self.completed_flags[key] = 0
+        return key
+
+    def add_words(self, key, words):
+        self.task_words[key] = words
+        for word in words:
+            keys = self.postings.get(word)
+            if keys is None:
+                self.postings[word] = keys = set()
+                insort(self.vocabulary, word)
+            keys.add(key)
+
+    def remove_words(self, key):
+        for word in self.task_words.pop(key):
+            keys = self.postings[word]
+            keys.discard(key)
+            if not keys:
+                del self.postings[word]
+                del self.vocabulary[bisect_left(self.vocabulary, word)]
+
+    def renumber_from(self, position):
+        """Moves the keys from position on up by one, leaving a gap at position."""
+        # Not build_words() here: during insert() the task list already holds the new task
+        # while keys does not, so the words are moved only if they were built before
+        if position < len(self.keys):
+            self.renumbered = self.keys[position]
+        for i in range(len(self.keys) - 1, position - 1, -1):
+            old_key = self.keys[i]
+            new_key = old_key + 1
+            if self.words_built:
+                words = self.task_words.pop(old_key)
+                for word in words:
+                    self.postings[word].discard(old_key)
+                    self.postings[word].add(new_key)
+                self.task_words[new_key] = words
+            if len(self.completed_flags) <= new_key:
+                self.completed_flags.append(0)
+            self.completed_flags[new_key] = self.completed_flags[old_key]
+            self.completed_flags[old_key] = 0
+            self.keys[i] = new_key
+        self.next_key = max(self.next_key, (self.keys[-1] + 1) if self.keys else 0)
+
+    def position(self, key):
+        """Returns the current position of the task with the given key."""
+        return bisect_left(self.keys, key)
+
+    def words_with_prefix(self, prefix):
+        """Returns the keys of all tasks that contain a word starting with prefix."""
+        start = bisect_left(self.vocabulary, prefix)
+        end = bisect_right(self.vocabulary, prefix + "\uffff")
+        if end - start == 1:
+            return self.postings[self.vocabulary[start]]
+        keys = set()
+        for word in self.vocabulary[start:end]:
+            keys |= self.postings[word]
+        return keys
+
+    def search(self, query, status=ALL):
+        """
+        Finds the tasks matching a search text and a status filter.
+        Every word in the query has to match the start of some word in the task.
+        :param query: The text typed into the search box.
+        :param status: ALL, PENDING or COMPLETED.
+        :return: The matching keys in list order, or None if nothing is filtered.
+        """
+        query_words = sorted(tokenize(query))
+        if not query_words and status == ALL:
+            return None
+        self.build_words()
+        if query_words:
+            candidates = sorted((self.words_with_prefix(w) for w in query_words), key=len)
+            matches = set(candidates[0])
+            for keys in candidates[1:]:
+                matches &= keys
+            keys = sorted(matches)
+        else:
+            keys = self.keys
+        if status != ALL:
+            wanted = 1 if status == COMPLETED else 0
+            flags = self.completed_flags
+            keys = [key for key in keys if flags[key] == wanted]
+        return list(keys)
+
+    def matches(self, position, query, status=ALL):
+        """Checks a single task against a search, without looking at any other task."""
+        key = self.keys[position]
+        if status != ALL and self.completed_flags[key] != (1 if status == COMPLETED else 0):
+            return False
+        self.build_words()
+        words = self.task_words[key]
+        return all(any(word.startswith(q) for word in words) for q in tokenize(query))
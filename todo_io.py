@@ -0,0 +1,177 @@
+"""
+Streaming import and export of tasks as JSON Lines or CSV.
+
+Files are read and written one record at a time through generators, so even
+a file with millions of tasks is never held in memory as a whole. The same
+functions back the Import/Export buttons of the To-Do List application and
+the command line:
+
+    python todo_io.py export backup.jsonl
+    python todo_io.py import more_tasks.csv --store tasks.json
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from itertools import islice
+
+from todo_model import Task
+from todo_storage import JournalStorage
+
+BATCH_SIZE = 5000 # Tasks handled per chunk during imports and exports
+
+TRUE_VALUES = {"true", "1", "yes", "y", "x", "done"}
+FALSE_VALUES = {"false", "0", "no", "n", ""}
+
+
+def file_format(path):
+    """Returns "csv" or "jsonl" based on the file extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Unsupported file type '{extension}'. Use .jsonl, .ndjson or .csv.")
+
+
+def make_task(text, completed, line_number):
+    """Validates one imported record and turns it into a Task."""
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError(f"Line {line_number}: task text is missing or empty.")
+    if isinstance(completed, str):
+        value = completed.strip().lower()
+        if value in TRUE_VALUES:
+            completed = True
+        elif value in FALSE_VALUES:
+            completed = False
+        else:
+            raise ValueError(f"Line {line_number}: cannot read completed value '{completed}'.")
+    return Task(text.strip(), bool(completed))
+
+
+def read_jsonl(f):
+    """Yields tasks from a binary file with one JSON object per line."""
+    for line_number, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {line_number}: invalid JSON ({e.msg}).")
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {line_number}: expected a JSON object.")
+        yield make_task(record.get("task"), record.get("completed", False), line_number)
+
+
+def read_csv(f):
+    """
+    Yields tasks from a binary CSV file. The first row must be a header with a "task" column;
+    a "completed" column is optional.
+    """
+    text = io.TextIOWrapper(f, encoding="utf-8", newline="")
+    try:
+        reader = csv.DictReader(text)
+        if reader.fieldnames is None or "task" not in reader.fieldnames:
+            raise ValueError("The CSV file needs a header row with a 'task' column.")
+        for record in reader:
+            yield make_task(record["task"], record.get("completed") or "", reader.line_num)
+    finally:
+        text.detach() # Otherwise the wrapper closes f when it is garbage collected
+
+
+def read_tasks(f, fmt):
+    """
+    Yields tasks from an open binary file.
+    The file is opened in binary mode so callers can use f.tell() to report progress.
+    :param fmt: "jsonl" or "csv", see file_format().
+    """
+    return read_csv(f) if fmt == "csv" else read_jsonl(f)
+
+
+def write_tasks(f, tasks, fmt, header=True):
+    """
+    Writes tasks to an open text file (opened with newline="").
+    Can be called once per batch; pass header=False after the first CSV batch.
+    :return: The number of tasks written.
+    """
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(f)
+        if header:
+            writer.writerow(["task", "completed"])
+        for task in tasks:
+            writer.writerow([task.text, "true" if task.completed else "false"])
+            count += 1
+    else:
+        for task in tasks:
+            f.write(json.dumps(task.to_dict()) + "\n")
+            count += 1
+    return count
+
+
+def batched(iterable, size=BATCH_SIZE):
+    """Yields lists of up to size items from iterable."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def import_file(path, store):
+    """Appends all tasks from path to the task store, printing progress to stderr."""
+    storage = JournalStorage(store)
+    tasks = storage.load()
+    total_bytes = os.path.getsize(path) or 1
+    imported = 0
+    with open(path, "rb") as f:
+        for batch in batched(read_tasks(f, file_format(path))):
+            tasks.extend(batch)
+            imported += len(batch)
+            print(f"\rImported {imported} tasks ({f.tell() * 100 // total_bytes}%)", end="", file=sys.stderr)
+    print(file=sys.stderr)
+    storage.save(tasks) # One snapshot write instead of journaling every single task
+    storage.close()
+    return imported
+
+
+def export_file(path, store):
+    """Writes every task in the task store to path."""
+    storage = JournalStorage(store)
+    tasks = storage.load()
+    storage.close()
+    fmt = file_format(path)
+    exported = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for batch in batched(tasks):
+            exported += write_tasks(f, batch, fmt, header=exported == 0)
+        if not exported:
+            write_tasks(f, [], fmt) # Still write the CSV header for an empty list
+    return exported
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import or export to-do tasks as JSON Lines (.jsonl) or CSV (.csv).")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("file", help="The .jsonl, .ndjson or .csv file to read or write.")
+    parser.add_argument("--store", default="tasks.json", help="The task file used by the app (default: tasks.json).")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "import":
+            count = import_file(args.file, args.store)
+            print(f"Imported {count} tasks into {args.store}.")
+        else:
+            count = export_file(args.file, args.store)
+            print(f"Exported {count} tasks to {args.file}.")
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
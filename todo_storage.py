@@ -0,0 +1,633 @@
+"""
+Storage backends for the To-Do List application.
+
+Every backend loads the full task list once at startup and is then told about
+each single change with record(). The JournalStorage backend only appends that
+change to a small log file, so an edit costs the same no matter how many tasks
+there are. The log is folded back into the main JSON file every so often.
+BackgroundWriter moves the writing of any backend onto its own thread.
+
+Several windows and command line scripts may use the same task file at once.
+Every write holds an advisory lock on <path>.lock, and poll() hands each of
+them the changes the others made, so nothing is overwritten or lost.
+"""
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+from todo_model import Task, tasks_from_json, tasks_to_json
+
+
+def apply_change(tasks, op, index, task=None):
+    """
+    Applies one recorded change to a task list in place.
+    :param tasks: The list of Task objects to change.
+    :param op: "add", "update" or "delete".
+    :param index: Position of the task the change refers to.
+    :param task: The new Task for "add" and "update".
+    """
+    if op == "add":
+        tasks.insert(index, task)
+    elif op == "update":
+        tasks[index] = task
+    elif op == "delete":
+        del tasks[index]
+    else:
+        raise ValueError(f"Unknown change type: {op}")
+
+
+def change_fits(length, op, index):
+    """Checks that a change refers to a position that exists in a list of length tasks."""
+    return 0 <= index < length + (op == "add")
+
+
+def rebase_pair(ours, theirs):
+    """
+    Rebases two changes made independently to the same list.
+    :return: (ours, theirs) where ours now applies after theirs and theirs after ours, so
+        both orders give the same list. Either may be None when it has nothing left to do.
+    """
+    op, i, task = ours
+    other_op, j, other_task = theirs
+    shifted = (other_op, j + (op == "add") - (op == "delete"), other_task) # theirs moved past ours
+    if other_op == "add":
+        if j <= i:
+            return (op, i + 1, task), theirs
+        return ours, shifted
+    if other_op == "delete":
+        if j < i:
+            return (op, i - 1, task), theirs
+        if j > i or op == "add":
+            return ours, shifted
+        if op == "update":
+            return ("add", i, task), None # They deleted the task we changed; keep our version
+        return None, None # Both deleted it
+    if j == i and op == "update":
+        return ours, None # Both changed the task; ours is written last, so it wins
+    if j == i and op == "delete":
+        return None, ("add", i, other_task) # We deleted the task they changed; keep their version
+    if j > i or j == i and op == "add":
+        return ours, shifted
+    return ours, theirs
+
+
+def rebase_changes(ours, theirs):
+    """
+    Rebases two lists of changes made independently to the same list, see rebase_pair.
+    :return: (ours, theirs) with ours rewritten to apply after theirs and theirs after ours.
+    """
+    theirs = list(theirs)
+    rebased_ours = []
+    for change in ours:
+        rebased_theirs = []
+        for other in theirs:
+            if change is not None:
+                change, other = rebase_pair(change, other)
+            if other is not None:
+                rebased_theirs.append(other)
+        theirs = rebased_theirs
+        if change is not None:
+            rebased_ours.append(change)
+    return rebased_ours, theirs
+
+
+def add_missing(tasks, changes):
+    """
+    Adds the tasks added or updated by changes whose positions can no longer be trusted
+    at the end of tasks, unless an equal task is already there. Deletions are skipped,
+    so nothing is ever lost, at worst a task shows up twice.
+    """
+    present = {(task.text, task.completed) for task in tasks}
+    for op, index, task in changes:
+        if task is not None and (task.text, task.completed) not in present:
+            tasks.append(task)
+            present.add((task.text, task.completed))
+
+
+class FileLock:
+    """
+    Advisory lock shared by every program that stores tasks in the same file.
+    It is held on a separate <path>.lock file, because the task file itself is
+    replaced on every save. Can be nested, and is also safe between threads.
+    """
+
+    def __init__(self, path):
+        """:param path: Path of the task file to lock."""
+        self.path = path + ".lock"
+        self.file = None
+        self.depth = 0
+        self.thread_lock = threading.RLock()
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        if self.depth == 0:
+            try:
+                self.file = open(self.path, "a+b")
+                if fcntl is not None:
+                    fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+                else:
+                    self.file.seek(0)
+                    msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1) # Retries for about 10 seconds
+            except OSError:
+                if self.file is not None:
+                    self.file.close()
+                    self.file = None
+                self.thread_lock.release()
+                raise
+        self.depth += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self.depth -= 1
+        if self.depth == 0:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+                else:
+                    self.file.seek(0)
+                    msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+            finally:
+                self.file.close()
+                self.file = None
+        self.thread_lock.release()
+
+
+def write_json_atomic(path, data):
+    """
+    Writes data as JSON to path without ever leaving a half-written file behind.
+    The data goes to a temporary file first, which then replaces the old file.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def parse_change(line):
+    """Turns one log line into an (op, index, task) tuple, or None if the line is torn or garbled."""
+    if not line.endswith(b"\n"):
+        return None
+    try:
+        change = json.loads(line)
+        op, index = change["op"], change["index"]
+        task = Task.from_dict(change["task"]) if op != "delete" else None
+    except (ValueError, TypeError, KeyError):
+        return None
+    if op not in ("add", "update", "delete") or type(index) is not int:
+        return None
+    return op, index, task
+
+
+def read_json_tasks(path):
+    """
+    Reads a list of Task objects from a JSON file. A missing file gives an empty list.
+    A corrupted file is moved aside to <path>.corrupt instead of being overwritten later.
+    """
+    try:
+        with open(path, "r") as f:
+            return tasks_from_json(json.load(f))
+    except FileNotFoundError:
+        return []
+    except json.JSONDecodeError:
+        os.replace(path, path + ".corrupt")
+        return []
+
+
+class TaskStorage:
+    """Base class for task storage backends."""
+
+    def load(self):
+        """Returns the stored list of Task objects."""
+        raise NotImplementedError
+
+    def record(self, op, index, task=None):
+        """Stores a single change (see apply_change for the arguments)."""
+        raise NotImplementedError
+
+    def record_many(self, changes):
+        """
+        Stores several changes at once. Backends override this to write them in one go.
+        :param changes: A list of (op, index, task) tuples, in order.
+        """
+        for op, index, task in changes:
+            self.record(op, index, task)
+
+    def save(self, tasks):
+        """Stores the complete task list, replacing whatever was stored before."""
+        raise NotImplementedError
+
+    def poll(self):
+        """
+        Checks cheaply whether other programs changed the stored tasks since the last
+        load() or poll(). Backends that cannot tell return None.
+        :return: None if nothing changed, ("changes", [(op, index, task), ...]) to apply
+            to the loaded list in order, or ("reload", tasks) with the complete new list.
+        """
+        return None
+
+    def close(self):
+        """Releases any open files."""
+        pass
+
+
+class JsonStorage(TaskStorage):
+    """
+    The original storage: the whole list is rewritten to one JSON file on every change.
+    Kept for small lists and for tools that expect tasks.json to always be up to date.
+    """
+
+    def __init__(self, path="tasks.json"):
+        self.path = path
+        self.lock = FileLock(path)
+
+    def load(self):
+        return read_json_tasks(self.path)
+
+    def record(self, op, index, task=None):
+        self.record_many([(op, index, task)])
+
+    def record_many(self, changes):
+        with self.lock: # Nobody may write between our read and our write
+            tasks = self.load()
+            for op, index, task in changes:
+                apply_change(tasks, op, index, task)
+            self.save(tasks)
+
+    def save(self, tasks):
+        with self.lock:
+            write_json_atomic(self.path, tasks_to_json(tasks))
+
+
+class JournalStorage(TaskStorage):
+    """
+    Stores a JSON snapshot (tasks.json) plus an append-only log of changes (tasks.json.journal).
+
+    Each change is one JSON line that is flushed and fsynced before record() returns,
+    so a crash loses at most the change being written. A torn last line is ignored
+    when the log is replayed. Once the log holds compact_every entries it is folded
+    into the snapshot. An existing tasks.json simply becomes the first snapshot.
+
+    The first line of the log names the snapshot it belongs to (its inode number, size
+    and mtime; every save replaces the file, so its inode number changes even when
+    the size and a coarse mtime do not).
+    A log left over from before a snapshot was rewritten no longer matches and is
+    ignored, so a crash during compaction can never apply the same change twice.
+
+    Other programs may use the same files at the same time. Every write holds the
+    FileLock and first reads only the log lines appended since this object last
+    looked (it remembers how many bytes of the log it has seen). Its own changes
+    are rebased onto those (rebase_changes) before being appended, and the others'
+    changes are kept for poll(). A compaction records in the new log which log it
+    folded, so the others can carry on; when that does not match what an object
+    has seen, it has lost track and poll() asks for a full reload instead.
+    """
+
+    def __init__(self, path="tasks.json", compact_every=500):
+        """
+        :param path: Path of the JSON snapshot file.
+        :param compact_every: Number of logged changes after which the log is compacted.
+        """
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.compact_every = compact_every
+        self.lock = FileLock(path)
+        self.journal_file = None
+        self.journal_valid = False # Whether the log on disk belongs to the current snapshot
+        self.journal_entries = 0
+        self.snapshot = None # snapshot_id() of the snapshot the loaded tasks are based on
+        self.offset = 0 # Bytes of the log this object has read or written
+        self.external = [] # Changes made by other programs, not yet handed out by poll()
+        self.reload_needed = False # Lost track of the other programs' changes
+        self.polled = None # State of the files at the last poll()
+
+    def snapshot_id(self):
+        """Returns [inode, size, mtime_ns] of the snapshot file, or None if it does not exist."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+    def journal_size(self):
+        """Returns the size of the log file in bytes, 0 if it does not exist."""
+        try:
+            return os.stat(self.journal_path).st_size
+        except FileNotFoundError:
+            return 0
+
+    def read_header(self):
+        """Returns (header dict, length in bytes) of the log's first line, or (None, 0) if there is none."""
+        try:
+            with open(self.journal_path, "rb") as f:
+                line = f.readline()
+        except FileNotFoundError:
+            return None, 0
+        try:
+            header = json.loads(line)
+        except ValueError:
+            return None, 0
+        return (header, len(line)) if isinstance(header, dict) and line.endswith(b"\n") else (None, 0)
+
+    def load(self):
+        with self.lock:
+            return self.load_locked()
+
+    def load_locked(self):
+        """Reads the snapshot and replays the log. Call with the lock held."""
+        tasks = read_json_tasks(self.path)
+        self.close()
+        self.snapshot = self.snapshot_id()
+        self.journal_entries = 0
+        self.external = []
+        self.reload_needed = False
+        header, self.offset = self.read_header()
+        written = header.get("snapshot") if header is not None else None
+        # Logs from older versions name the snapshot by [size, mtime_ns] only
+        legacy = self.snapshot is not None and written == self.snapshot[1:]
+        self.journal_valid = header is not None and (written == self.snapshot or legacy)
+        broken = legacy # Fold it so that the new log names the snapshot in full
+        if self.journal_valid:
+            with open(self.journal_path, "rb") as f:
+                f.seek(self.offset)
+                for line in f:
+                    change = parse_change(line)
+                    if change is None:
+                        broken = True # Torn write from a crash, nothing after it was committed
+                        break
+                    if not change_fits(len(tasks), change[0], change[1]):
+                        # Refers to a task that does not exist; keep the log aside instead of failing to start
+                        shutil.copyfile(self.journal_path, self.journal_path + ".corrupt")
+                        broken = True
+                        break
+                    apply_change(tasks, *change)
+                    self.offset += len(line)
+                    self.journal_entries += 1
+        if broken:
+            # New changes must not be appended after the broken line, so fold the log now
+            self.save_locked(tasks)
+        return tasks
+
+    def catch_up(self):
+        """
+        Reads the log lines other programs appended since this object last looked
+        into self.external, or sets reload_needed. Call with the lock held.
+        """
+        snapshot = self.snapshot_id()
+        if snapshot != self.snapshot or not self.journal_valid:
+            header, length = self.read_header()
+            if header is None or header.get("snapshot") != snapshot:
+                if snapshot != self.snapshot:
+                    self.reload_needed = True # Rewritten, and no log for the new snapshot yet
+                return
+            if snapshot != self.snapshot and header.get("previous") != [self.snapshot, self.offset]:
+                self.reload_needed = True # Rewritten with changes this object never saw
+                return
+            # A new log was started, for our snapshot or for a compaction of everything we saw
+            self.close()
+            self.snapshot = snapshot
+            self.offset = length
+            self.journal_valid = True
+            self.journal_entries = 0
+        if self.journal_size() == self.offset:
+            return # Nothing new, the usual case
+        with open(self.journal_path, "rb") as f:
+            f.seek(self.offset)
+            for line in f:
+                change = parse_change(line)
+                if change is None:
+                    self.reload_needed = True # Torn line; the next load folds the log
+                    return
+                self.external.append(change)
+                self.offset += len(line)
+                self.journal_entries += 1
+
+    def start_journal(self, previous=None):
+        """
+        Starts an empty log that belongs to the current snapshot.
+        :param previous: [snapshot id, log size] of the log that was folded into the snapshot, if any.
+        """
+        self.close()
+        self.snapshot = self.snapshot_id()
+        self.journal_valid = False # Until the header is written; the old log does not match the new snapshot
+        header = (json.dumps({"snapshot": self.snapshot, "previous": previous}) + "\n").encode()
+        with open(self.journal_path, "wb") as f:
+            f.write(header)
+            f.flush()
+            os.fsync(f.fileno())
+        # Changes are appended through a file opened in append mode, see record_many(), so
+        # they always land at the end of the log, whoever else has written to it since
+        self.journal_valid = True
+        self.journal_entries = 0
+        self.offset = len(header)
+
+    def record(self, op, index, task=None):
+        self.record_many([(op, index, task)])
+
+    def record_many(self, changes):
+        with self.lock:
+            self.catch_up()
+            if self.reload_needed:
+                # Our positions cannot be trusted, so keep every task we added or changed
+                tasks = self.load_locked()
+                add_missing(tasks, changes)
+                self.save_locked(tasks)
+                self.reload_needed = True
+                return
+            changes, self.external = rebase_changes(changes, self.external)
+            if not self.journal_valid:
+                self.start_journal()
+            if self.journal_file is None:
+                self.journal_file = open(self.journal_path, "ab")
+            lines = []
+            for op, index, task in changes:
+                change = {"op": op, "index": index}
+                if task is not None:
+                    change["task"] = task.to_dict()
+                lines.append(json.dumps(change) + "\n")
+            data = "".join(lines).encode()
+            try:
+                self.journal_file.write(data)
+                self.journal_file.flush()
+                os.fsync(self.journal_file.fileno()) # One sync for the whole batch
+            except OSError:
+                # Cut off whatever part of the batch made it, so that writing it again is safe
+                self.close()
+                try:
+                    os.truncate(self.journal_path, self.offset)
+                except OSError:
+                    pass
+                raise
+            self.offset += len(data)
+            self.journal_entries += len(lines)
+            if self.journal_entries >= self.compact_every:
+                try:
+                    self.compact()
+                except OSError:
+                    pass # The changes are safely in the log; the next write tries to compact again
+
+    def compact(self):
+        """Folds the change log into the snapshot file and starts an empty log."""
+        with self.lock:
+            self.catch_up()
+            external, reload_needed = self.external, self.reload_needed
+            previous = None if reload_needed else [self.snapshot, self.offset]
+            try:
+                self.save_locked(self.load_locked(), previous)
+            finally:
+                # The folded log holds the others' changes we have not handed out yet
+                self.external, self.reload_needed = external, reload_needed
+
+    def save(self, tasks):
+        with self.lock:
+            self.catch_up()
+            if self.external or self.reload_needed:
+                # Others changed the list since we read it; keep the tasks they added or changed
+                stored = self.load_locked()
+                tasks = list(tasks)
+                add_missing(tasks, [("add", index, task) for index, task in enumerate(stored)])
+                self.reload_needed = True
+            self.save_locked(tasks)
+
+    def save_locked(self, tasks, previous=None):
+        """Writes tasks as the new snapshot and starts an empty log. Call with the lock held."""
+        write_json_atomic(self.path, tasks_to_json(tasks))
+        self.start_journal(previous)
+
+    def poll(self):
+        # Two stat() calls when nothing changed; only new log lines are read otherwise
+        state = (self.snapshot_id(), self.journal_size())
+        if state == self.polled and not self.external and not self.reload_needed:
+            return None
+        with self.lock:
+            self.polled = state
+            self.catch_up()
+            if self.reload_needed:
+                return "reload", self.load_locked()
+            changes, self.external = self.external, []
+        return ("changes", changes) if changes else None
+
+    def close(self):
+        if self.journal_file is not None:
+            self.journal_file.close()
+            self.journal_file = None
+
+
+class BackgroundWriter(TaskStorage):
+    """
+    Wraps another backend and does all of its writing on a separate thread.
+
+    record() and save() only put the change on a queue, so they return right away
+    however slow the disk is. The writer thread waits until no new change has
+    arrived for `delay` seconds (or at most `max_delay` seconds during a constant
+    stream of edits) and then writes everything it collected in one batch.
+
+    A batch that fails to write is kept and written again, together with the
+    next batch or after `retry_delay` seconds, so that no change is skipped and
+    later changes never refer to positions that are not on disk.
+    """
+
+    def __init__(self, storage, delay=0.3, max_delay=2.0, retry_delay=5.0):
+        """
+        :param storage: The backend that actually writes to disk.
+        :param delay: Quiet time in seconds after the last change before writing.
+        :param max_delay: Longest time in seconds a change may wait to be written.
+        :param retry_delay: Time in seconds before a failed batch is written again.
+        """
+        self.storage = storage
+        self.delay = delay
+        self.max_delay = max_delay
+        self.retry_delay = retry_delay
+        self.queue = queue.Queue()
+        self.failed = [] # Items of batches that could not be written yet, oldest first
+        self.error = None # Exception of the last failed write, for the GUI to report; None once writing works
+        self.thread = threading.Thread(target=self.run, name="task-writer", daemon=True)
+        self.thread.start()
+
+    def load(self):
+        self.flush()
+        return self.storage.load()
+
+    def record(self, op, index, task=None):
+        self.queue.put(("record", (op, index, task)))
+
+    def save(self, tasks):
+        # Copy the tasks so later edits on the Tk thread cannot change what gets written
+        self.queue.put(("save", [task.copy() for task in tasks]))
+
+    def unsaved_changes(self):
+        """Returns the number of changes that have not been written yet."""
+        return self.queue.unfinished_tasks + len(self.failed)
+
+    def poll(self):
+        # The backend's changes are relative to what it has written, so wait until that is everything
+        if self.unsaved_changes():
+            return None
+        return self.storage.poll()
+
+    def flush(self):
+        """Writes everything queued so far right away and waits until it is on disk."""
+        if self.thread.is_alive():
+            self.queue.put(("flush", None))
+            self.queue.join()
+
+    def close(self):
+        """Writes any pending changes, stops the writer thread and closes the backend."""
+        if self.thread.is_alive():
+            self.queue.put(("stop", None))
+            self.thread.join()
+        self.storage.close()
+
+    def run(self):
+        stopping = False
+        while not stopping:
+            try:
+                batch = [self.queue.get(timeout=self.retry_delay if self.failed else None)]
+            except queue.Empty:
+                batch = [] # Nothing new, just try the failed items again
+            deadline = time.monotonic() + self.max_delay
+            # Keep collecting until the edits pause, or until the batch has waited long enough
+            while batch and batch[-1][0] not in ("flush", "stop"):
+                timeout = min(self.delay, deadline - time.monotonic())
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            stopping = bool(batch) and batch[-1][0] == "stop"
+            items = self.failed + batch
+            try:
+                self.write_batch(items)
+                self.failed = []
+                self.error = None
+            except Exception as e:
+                self.error = e
+                self.failed = [item for item in items if item[0] in ("record", "save")]
+            for _ in batch:
+                self.queue.task_done()
+
+    def write_batch(self, batch):
+        """Writes one batch of queued items. A full save makes all earlier changes redundant."""
+        snapshot = None
+        changes = []
+        for kind, payload in batch:
+            if kind == "save":
+                snapshot = payload
+                changes = []
+            elif kind == "record":
+                changes.append(payload)
+        if snapshot is not None:
+            self.storage.save(snapshot)
+        if changes:
+            self.storage.record_many(changes)
@@ -0,0 +1,181 @@
+"""
+Opt-in timing of the apps' button callbacks and of stalls in the Tk event loop.
+
+Off unless asked for, either on the command line of an app or in the environment:
+
+    python calculator.py --metrics metrics.json --profile-slow 50
+    UI_METRICS=metrics.json UI_METRICS_PROFILE_MS=50 python "to do list aditya.py"
+
+Each listed callback of the app class is wrapped so that every call adds its
+duration to a histogram. A heartbeat scheduled with after() every HEARTBEAT_MS
+measures how late it runs; that lateness is time the event loop spent unable
+to handle input (a stall), whatever caused it. The histograms are written as
+JSON when the program exits.
+
+With --profile-slow MS every callback runs under cProfile, and the profile of
+any call that takes MS or longer is saved next to the metrics file
+(<metrics>.<Class>.<callback>.<n>.prof, readable with pstats or snakeviz).
+Profiling slows the callbacks down, so time without it when comparing numbers.
+"""
+import argparse
+import atexit
+import bisect
+import cProfile
+import datetime
+import functools
+import json
+import os
+import time
+
+METRICS_VARIABLE = "UI_METRICS" # Environment variable naming the metrics file
+PROFILE_VARIABLE = "UI_METRICS_PROFILE_MS" # Environment variable with the slow-call threshold
+HEARTBEAT_MS = 100
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000) # Upper bounds of the histogram buckets
+MAX_PROFILES = 50 # Slow-call profiles saved at most per run
+
+
+class Histogram:
+    """Counts durations in milliseconds into the BUCKETS_MS buckets, plus count, total and maximum."""
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def to_dict(self):
+        labels = [f"<={bound}ms" for bound in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "total_ms": round(self.total, 3),
+            "mean_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max, 3),
+            "histogram": {label: n for label, n in zip(labels, self.counts) if n},
+        }
+
+
+class Instrumentation:
+    """Collects callback durations and event loop stalls; see the module docstring."""
+
+    def __init__(self, path, profile_ms=None, heartbeat_ms=HEARTBEAT_MS):
+        """
+        :param path: JSON file the results are written to by dump().
+        :param profile_ms: Save a cProfile of calls taking at least this long; None turns profiling off.
+        """
+        self.path = path
+        self.profile_ms = profile_ms
+        self.heartbeat_ms = heartbeat_ms
+        self.callbacks = {}
+        self.stalls = Histogram()
+        self.profiles = []
+        self.profiling = False # A profiled call is running, so nested callbacks are not profiled again
+        self.started = datetime.datetime.now()
+        self.master = None
+        self.expected = None
+
+    def instrument(self, app_class, names):
+        """Wraps the named methods of app_class. Do this before creating the app, so its buttons get the wrappers."""
+        for name in names:
+            func = getattr(app_class, name)
+            if not getattr(func, "instrumented", False):
+                setattr(app_class, name, self.wrap(func, f"{app_class.__name__}.{name}"))
+
+    def wrap(self, func, label):
+        """Returns func wrapped to time each call into the histogram for label."""
+        histogram = self.callbacks.setdefault(label, Histogram())
+        clock = time.perf_counter
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if self.profile_ms is not None and not self.profiling:
+                return self.call_profiled(func, label, histogram, args, kwargs)
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.add((clock() - start) * 1000)
+
+        wrapper.instrumented = True
+        return wrapper
+
+    def call_profiled(self, func, label, histogram, args, kwargs):
+        """Runs one call under cProfile and keeps the profile if the call was slow."""
+        profiler = cProfile.Profile()
+        self.profiling = True
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            ms = (time.perf_counter() - start) * 1000
+            self.profiling = False
+            histogram.add(ms)
+            if ms >= self.profile_ms and len(self.profiles) < MAX_PROFILES:
+                path = f"{self.path}.{label}.{len(self.profiles) + 1}.prof"
+                try:
+                    profiler.dump_stats(path)
+                    self.profiles.append({"callback": label, "ms": round(ms, 3), "file": path})
+                except OSError:
+                    pass
+
+    def start(self, master):
+        """Starts the heartbeat on a Tk widget and writes the results when the program exits."""
+        self.master = master
+        self.expected = time.perf_counter() + self.heartbeat_ms / 1000
+        master.after(self.heartbeat_ms, self.heartbeat)
+        atexit.register(self.dump)
+
+    def heartbeat(self):
+        """Records how late this after() callback ran, then schedules the next one."""
+        now = time.perf_counter()
+        self.stalls.add(max(0.0, (now - self.expected) * 1000))
+        self.expected = now + self.heartbeat_ms / 1000
+        try:
+            self.master.after(self.heartbeat_ms, self.heartbeat)
+        except Exception:
+            pass # The window is being destroyed
+
+    def report(self):
+        """Returns the results as a dictionary."""
+        return {
+            "started": self.started.isoformat(timespec="seconds"),
+            "duration_s": round((datetime.datetime.now() - self.started).total_seconds(), 3),
+            "callbacks": {label: histogram.to_dict() for label, histogram in self.callbacks.items() if histogram.count},
+            "stalls": dict(self.stalls.to_dict(), heartbeat_ms=self.heartbeat_ms),
+            "slow_profiles": self.profiles,
+        }
+
+    def dump(self):
+        """Writes the results to the metrics file."""
+        try:
+            with open(self.path, "w") as f:
+                json.dump(self.report(), f, indent=2)
+        except OSError as e:
+            print(f"Could not write the UI metrics to {self.path}: {e}")
+
+
+def start_metrics(master, app_class, names, argv=None):
+    """
+    Instruments app_class and starts the heartbeat on master if --metrics (or UI_METRICS) is given.
+    Call it before creating the app. Other command line arguments are left alone.
+    :return: The Instrumentation, or None when instrumentation is off.
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--metrics", default=os.environ.get(METRICS_VARIABLE))
+    parser.add_argument("--profile-slow", type=float, default=os.environ.get(PROFILE_VARIABLE))
+    args, _ = parser.parse_known_args(argv)
+    if not args.metrics:
+        return None
+    metrics = Instrumentation(os.path.abspath(args.metrics), args.profile_slow)
+    metrics.instrument(app_class, names)
+    metrics.start(master)
+    return metrics
@@ -0,0 +1,174 @@
+import tkinter as tk
+
+
+class VirtualListbox(tk.Frame):
+    """
+    A listbox that only creates Tk items for the rows on screen plus a few extra.
+
+    The rows are not stored in the widget. Instead it asks get_row(row) for the
+    text and item options of each row it is about to show, and row_count() for
+    the total number of rows. Whoever owns the data tells the widget about changes
+    with rows_inserted(), rows_deleted(), row_changed() or reset(). The time to
+    show, scroll or change the list therefore depends on the window height, not
+    on the number of rows.
+
+    Row numbers used by this class are always "virtual" rows (0 .. row_count()-1),
+    never positions inside the underlying tk.Listbox.
+    """
+
+    def __init__(self, master, row_count, get_row, on_select=None, height=15, width=60, overscan=10):
+        """
+        :param master: The parent widget.
+        :param row_count: Function returning the total number of rows.
+        :param get_row: Function taking a row number and returning (text, options),
+            where options is a dict for Listbox.itemconfig or None.
+        :param on_select: Called with the Tk event when the user selects a row.
+        :param height: Number of visible rows.
+        :param width: Width of the list in characters.
+        :param overscan: Extra rows kept above and below the visible ones so short scrolls need no redraw.
+        """
+        super().__init__(master)
+        self.row_count = row_count
+        self.get_row = get_row
+        self.on_select = on_select
+        self.height = height
+        self.overscan = overscan
+
+        self.top = 0 # First visible row
+        self.window_start = 0 # Row shown in the first item of the inner listbox
+        self.window_end = 0 # One past the last row materialized in the inner listbox
+        self.selected = None # Selected row, or None
+
+        self.listbox = tk.Listbox(self, width=width, height=height, exportselection=False)
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self.on_scrollbar)
+        self.listbox.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.listbox.bind("<<ListboxSelect>>", self.on_listbox_select)
+        self.listbox.bind("<MouseWheel>", self.on_mousewheel) # Windows and macOS
+        self.listbox.bind("<Button-4>", lambda event: self.scroll(-3)) # X11 wheel up
+        self.listbox.bind("<Button-5>", lambda event: self.scroll(3)) # X11 wheel down
+        self.listbox.bind("<Up>", lambda event: self.move_selection(-1))
+        self.listbox.bind("<Down>", lambda event: self.move_selection(1))
+        self.listbox.bind("<Prior>", lambda event: self.scroll(-self.height))
+        self.listbox.bind("<Next>", lambda event: self.scroll(self.height))
+
+    # --- Listbox-like selection API ---
+
+    def curselection(self):
+        """Returns a tuple with the selected row, or an empty tuple, like tk.Listbox."""
+        return () if self.selected is None else (self.selected,)
+
+    def selection_set(self, row):
+        self.selected = row
+        self.listbox.selection_clear(0, tk.END)
+        if self.window_start <= row < self.window_end:
+            self.listbox.selection_set(row - self.window_start)
+
+    def selection_clear(self):
+        self.selected = None
+        self.listbox.selection_clear(0, tk.END)
+
+    def see(self, row):
+        """Scrolls so that row is visible."""
+        if row < self.top:
+            self.scroll_to(row)
+        elif row >= self.top + self.height:
+            self.scroll_to(row - self.height + 1)
+
+    # --- Change notifications from the data owner ---
+
+    def reset(self):
+        """Redraws everything, e.g. after the whole data set was replaced."""
+        self.selected = None
+        self.scroll_to(self.top, force=True)
+
+    def rows_inserted(self, row, count=1):
+        if self.selected is not None and self.selected >= row:
+            self.selected += count
+        self.changed_from(row)
+
+    def rows_deleted(self, row, count=1):
+        if self.selected is not None:
+            if row <= self.selected < row + count:
+                self.selected = None
+            elif self.selected >= row + count:
+                self.selected -= count
+        self.changed_from(row)
+
+    def row_changed(self, row):
+        self.changed_from(row, row + 1)
+
+    def changed_from(self, first, last=None):
+        """Redraws the window if rows first..last (or everything after first) are materialized."""
+        force = first < self.window_end and (last is None or last > self.window_start)
+        self.scroll_to(self.top, force=force) # Without force this only draws rows that just became visible
+
+    # --- Scrolling ---
+
+    def scroll(self, rows):
+        self.scroll_to(self.top + rows)
+        return "break" # Stop the default Listbox binding from scrolling the inner list
+
+    def scroll_to(self, top, force=False):
+        """Makes row top the first visible row, materializing new rows only if needed."""
+        count = self.row_count()
+        top = max(0, min(top, count - self.height))
+        self.top = top
+        visible_end = min(count, top + self.height)
+        if force or top < self.window_start or visible_end > self.window_end:
+            self.render(max(0, top - self.overscan), min(count, visible_end + self.overscan))
+        self.listbox.yview(top - self.window_start)
+        self.update_scrollbar()
+
+    def render(self, start, end):
+        """Replaces the items of the inner listbox with rows start..end-1."""
+        self.window_start = start
+        self.window_end = end
+        rows = [self.get_row(row) for row in range(start, end)]
+        self.listbox.delete(0, tk.END)
+        self.listbox.insert(tk.END, *[text for text, options in rows])
+        for i, (text, options) in enumerate(rows):
+            if options:
+                self.listbox.itemconfig(i, options)
+        if self.selected is not None and start <= self.selected < end:
+            self.listbox.selection_set(self.selected - start)
+
+    def update_scrollbar(self):
+        count = self.row_count()
+        if count <= self.height:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.top / count, (self.top + self.height) / count)
+
+    # --- Event handlers ---
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * self.row_count()))
+        elif action == "scroll":
+            step = self.height if unit == "pages" else 1
+            self.scroll(int(amount) * step)
+
+    def on_mousewheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def on_listbox_select(self, event):
+        selection = self.listbox.curselection()
+        if not selection:
+            return
+        self.selected = self.window_start + selection[0]
+        if self.on_select is not None:
+            self.on_select(event)
+
+    def move_selection(self, step):
+        """Moves the selection up or down with the arrow keys, scrolling as needed."""
+        count = self.row_count()
+        if not count:
+            return "break"
+        row = 0 if self.selected is None else max(0, min(self.selected + step, count - 1))
+        self.see(row)
+        self.selection_set(row)
+        if self.on_select is not None:
+            self.on_select(None)
+        return "break"